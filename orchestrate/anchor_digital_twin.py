@@ -1,6 +1,13 @@
+import bisect
 import math
 import time
 import threading
+from collections import deque
+from itertools import islice
+from operator import itemgetter
+
+_PI = math.pi
+_TWO_PI = 2 * math.pi
 
 class AnchorZoneDigitalTwin:
     """
@@ -11,9 +18,12 @@ class AnchorZoneDigitalTwin:
     def __init__(self, anchor_center=(0, 0, 0), zone_radius=5.0):
         self.anchor_center = {'x': anchor_center[0], 'y': anchor_center[1], 'z': anchor_center[2]}
         self.zone_radius = zone_radius
+        self._zone_radius_sq = zone_radius * zone_radius
         
         # Entity tracking
         self.entities = {}  # node_id -> entity data
+        self._entities_in_zone = 0  # maintained incrementally in update_entity_position
+        self.version = 0  # bumped on every position update - lets readers skip unchanged state
         self.tumbller_id = None
         self.target_person_id = None
         
@@ -21,15 +31,18 @@ class AnchorZoneDigitalTwin:
         self.tumbller_orientation = {
             'yaw': 0.0,  # Current heading in radians
             'angular_velocity': 0.0,  # Current yaw rate in rad/s
-            'last_update': time.time()
+            'last_update': time.monotonic()  # only used for dt integration
         }
         
         # State history for analysis
-        self.position_history = {}  # node_id -> list of recent positions
+        self.position_history = {}  # node_id -> deque of recent positions
         self.max_history_length = 50
         
         # Thread safety
         self._lock = threading.Lock()
+        
+        # Change notification - tuple is replaced on register, so iteration needs no lock
+        self._update_callbacks = ()
     
     def register_tumbller(self, node_id):
         """Register which node ID corresponds to the Tumbller"""
@@ -43,11 +56,23 @@ class AnchorZoneDigitalTwin:
             self.target_person_id = node_id
             print(f"👤 Registered target person with node ID: {node_id}")
     
+    def register_update_callback(self, callback):
+        """Register callback(node_id), invoked after each position update (outside the lock)"""
+        with self._lock:
+            self._update_callbacks = self._update_callbacks + (callback,)
+    
     def update_entity_position(self, node_id, position):
-        """Update position of an entity (tag) in the anchor zone"""
+        """
+        Update position of an entity (tag) in the anchor zone.
+        The twin keeps a reference to `position` - the caller must not mutate
+        it after passing it in (LocationMQTT builds a fresh dict per message).
+        """
+        # Computed outside the lock - only depends on immutable zone config
+        # Monotonic: history is bisected by timestamp, a wall-clock jump (NTP) would break the ordering
+        current_time = time.monotonic()
+        in_zone = self._is_in_anchor_zone(position)
+        
         with self._lock:
-            current_time = time.time()
-            
             # Update entity data
             if node_id not in self.entities:
                 self.entities[node_id] = {
@@ -55,10 +80,15 @@ class AnchorZoneDigitalTwin:
                     'first_seen': current_time
                 }
             
+            # Keep the in-zone count current so the summary needs no full scan
+            was_in_zone = self.entities[node_id].get('in_zone', False)
+            if in_zone != was_in_zone:
+                self._entities_in_zone += 1 if in_zone else -1
+            
             self.entities[node_id].update({
-                'position': position.copy(),
+                'position': position,
                 'last_update': current_time,
-                'in_zone': self._is_in_anchor_zone(position)
+                'in_zone': in_zone
             })
             
             # Determine entity type
@@ -68,33 +98,33 @@ class AnchorZoneDigitalTwin:
                 self.entities[node_id]['type'] = 'target_person'
             
             # Update position history
+            # Bounded deque evicts the oldest entry in O(1)
             if node_id not in self.position_history:
-                self.position_history[node_id] = []
+                self.position_history[node_id] = deque(maxlen=self.max_history_length)
             
             self.position_history[node_id].append({
-                'position': position.copy(),
+                'position': position,
                 'timestamp': current_time
             })
-            
-            # Limit history length
-            if len(self.position_history[node_id]) > self.max_history_length:
-                self.position_history[node_id].pop(0)
+            self.version += 1
+        
+        # Notify listeners after releasing the lock so they may query the twin
+        for callback in self._update_callbacks:
+            callback(node_id)
     
     def update_tumbller_orientation(self, angular_velocity_data):
         """Update Tumbller's orientation based on angular velocity from Bluetooth"""
         with self._lock:
-            current_time = time.time()
+            current_time = time.monotonic()
             dt = current_time - self.tumbller_orientation['last_update']
             
             # Integrate angular velocity to get current heading
             yaw_rate = angular_velocity_data['yaw_rate']
             self.tumbller_orientation['yaw'] += yaw_rate * dt
             
-            # Normalize yaw to [-π, π]
-            self.tumbller_orientation['yaw'] = math.atan2(
-                math.sin(self.tumbller_orientation['yaw']),
-                math.cos(self.tumbller_orientation['yaw'])
-            )
+            # Normalize yaw to [-π, π) - one float mod instead of atan2(sin, cos)
+            yaw = self.tumbller_orientation['yaw']
+            self.tumbller_orientation['yaw'] = (yaw + _PI) % _TWO_PI - _PI
             
             self.tumbller_orientation['angular_velocity'] = yaw_rate
             self.tumbller_orientation['last_update'] = current_time
@@ -104,14 +134,25 @@ class AnchorZoneDigitalTwin:
         dx = position['x'] - self.anchor_center['x']
         dy = position['y'] - self.anchor_center['y']
         dz = position['z'] - self.anchor_center['z']
-        distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-        return distance <= self.zone_radius
+        return dx*dx + dy*dy + dz*dz <= self._zone_radius_sq
     
     def get_entity_state(self, node_id):
         """Get current state of a specific entity"""
         with self._lock:
             return self.entities.get(node_id, None)
     
+    def get_entity_positions(self, node_ids):
+        """
+        Get the current positions of several entities under a single lock acquisition.
+        Returns a tuple in node_ids order, None for entities without a position.
+        """
+        with self._lock:
+            entities = self.entities
+            return tuple(
+                entities[node_id].get('position') if node_id in entities else None
+                for node_id in node_ids
+            )
+    
     def get_tumbller_state(self):
         """Get complete state of the Tumbller (position + orientation)"""
         with self._lock:
@@ -145,44 +186,67 @@ class AnchorZoneDigitalTwin:
             if node_id not in self.position_history:
                 return []
             
-            current_time = time.time()
-            trajectory = [
-                entry for entry in self.position_history[node_id]
-                if current_time - entry['timestamp'] <= time_window
-            ]
-            return trajectory
+            # History is appended in time order - binary search for the window start
+            history = self.position_history[node_id]
+            cutoff = time.monotonic() - time_window  # same clock as update_entity_position
+            start = bisect.bisect_left(history, cutoff, key=itemgetter('timestamp'))
+            return list(islice(history, start, None))
     
     def calculate_distance_between_entities(self, node_id1, node_id2):
         """Calculate 3D distance between two entities"""
         with self._lock:
-            entity1 = self.entities.get(node_id1)
-            entity2 = self.entities.get(node_id2)
-            
-            if not entity1 or not entity2:
-                return None
-            
-            pos1 = entity1['position']
-            pos2 = entity2['position']
-            
-            dx = pos1['x'] - pos2['x']
-            dy = pos1['y'] - pos2['y']
-            dz = pos1['z'] - pos2['z']
-            
-            return math.sqrt(dx*dx + dy*dy + dz*dz)
-    
+            return self._distance_between_entities(node_id1, node_id2)
+
+    def calculate_distance_squared_between_entities(self, node_id1, node_id2):
+        """Squared 3D distance - cheaper when only comparing against a threshold"""
+        with self._lock:
+            return self._distance_squared_between_entities(node_id1, node_id2)
+
+    def _distance_between_entities(self, node_id1, node_id2):
+        """Distance calculation without locking - caller must hold self._lock"""
+        entity1 = self.entities.get(node_id1)
+        entity2 = self.entities.get(node_id2)
+
+        if not entity1 or not entity2:
+            return None
+
+        pos1 = entity1['position']
+        pos2 = entity2['position']
+
+        # One C-level call, no intermediate squares as Python floats
+        return math.hypot(pos1['x'] - pos2['x'], pos1['y'] - pos2['y'], pos1['z'] - pos2['z'])
+
+    def _distance_squared_between_entities(self, node_id1, node_id2):
+        """Squared distance without locking - caller must hold self._lock"""
+        entity1 = self.entities.get(node_id1)
+        entity2 = self.entities.get(node_id2)
+
+        if not entity1 or not entity2:
+            return None
+
+        pos1 = entity1['position']
+        pos2 = entity2['position']
+
+        dx = pos1['x'] - pos2['x']
+        dy = pos1['y'] - pos2['y']
+        dz = pos1['z'] - pos2['z']
+
+        return dx*dx + dy*dy + dz*dz
+
     def get_model_summary(self):
         """Get a summary of the current model state for monitoring"""
         with self._lock:
             summary = {
                 'total_entities': len(self.entities),
-                'entities_in_zone': sum(1 for e in self.entities.values() if e.get('in_zone', False)),
+                'entities_in_zone': self._entities_in_zone,
                 'tumbller_registered': self.tumbller_id is not None,
                 'target_registered': self.target_person_id is not None,
                 'model_timestamp': time.time()
             }
             
             if self.tumbller_id and self.target_person_id:
-                distance = self.calculate_distance_between_entities(self.tumbller_id, self.target_person_id)
+                # self._lock is not reentrant - use the unlocked helper
+                distance = self._distance_between_entities(self.tumbller_id, self.target_person_id)
                 summary['tumbller_to_target_distance'] = distance
             
             return summary
@@ -1,7 +1,10 @@
-from queue import PriorityQueue
+import heapq
+from itertools import count
 
 # --- A* Implementation (provided) ---
 class AStarNode:
+    __slots__ = ('data', 'predecessor', 'g', 'h', 'f')
+
     def __init__(self, data, predecessor=None):
         self.data = data
         self.predecessor = predecessor
@@ -13,13 +16,15 @@ class AStarNode:
 
 
 def astar(start, end, successors, h):
-    open_pqueue = PriorityQueue()
-    open_pqueue.put(AStarNode(start))
+    # Plain heap - A* is single-threaded, no need for PriorityQueue's locking.
+    # The counter breaks ties on f without falling back to AStarNode.__lt__.
+    tie = count()
+    open_heap = [(0, next(tie), AStarNode(start))]
     best_g = dict()
     closed = set()
     
-    while not open_pqueue.empty():
-        current = open_pqueue.get()
+    while open_heap:
+        current = heapq.heappop(open_heap)[2]
         if current.data in closed:
             continue
         closed.add(current.data)
@@ -42,6 +47,6 @@ def astar(start, end, successors, h):
             if successor in best_g and node.g >= best_g[successor]:
                 continue
             
-            open_pqueue.put(node)
+            heapq.heappush(open_heap, (node.f, next(tie), node))
             best_g[successor] = node.g
     return None
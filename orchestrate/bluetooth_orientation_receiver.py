@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+
+class BluetoothOrientationReceiver:
+    """
+    Liefert die Drehrate (yaw rate) des Tumbllers an den Digital Twin.
+    Läuft als asyncio-Task auf dem Event Loop des Aufrufers - kein eigener Thread.
+    """
+
+    def __init__(self, update_interval=0.1):
+        self.update_interval = update_interval  # 10 Hz
+        self.is_running = False
+        self._orientation_callback = None
+        self._task = None
+
+    def set_orientation_callback(self, callback):
+        """Register the consumer callback to receive angular velocity dicts."""
+        self._orientation_callback = callback
+
+    async def start(self):
+        """Startet den Empfang als Task auf dem laufenden Event Loop"""
+        if self.is_running:
+            return
+        self.is_running = True
+        self._task = asyncio.create_task(self._simulate_loop())
+
+    async def stop(self):
+        """Stoppt den Empfangs-Task"""
+        self.is_running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _simulate_loop(self):
+        """
+        Simuliert einen stehenden Tumbller (yaw_rate = 0).
+        Für echte Daten hier bleak's start_notify nutzen statt eines Threads.
+        """
+        while self.is_running:
+            await asyncio.sleep(self.update_interval)
+            if self._orientation_callback:
+                self._orientation_callback({
+                    'yaw_rate': 0.0,
+                    'timestamp': time.time()
+                })
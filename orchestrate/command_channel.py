@@ -0,0 +1,54 @@
+import threading
+from collections import deque
+from queue import Empty
+
+
+class CommandChannel:
+    """
+    Single-Producer/Single-Consumer Kanal für Roboter-Befehle.
+    deque.append/popleft sind atomar - kein Lock pro Befehl, das Event dient nur zum Aufwecken.
+    Gleiche Schnittstelle wie queue.Queue (put/get/get_nowait, wirft queue.Empty).
+    Begrenzt auf maxsize Einträge: ist der Kanal voll, fällt der älteste (veraltete) Befehl raus.
+    """
+
+    def __init__(self, maxsize=64):
+        self._items = deque(maxlen=maxsize)
+        self._ready = threading.Event()
+        self._waker = None
+        self.dropped = 0  # Anzahl verworfener Befehle (z.B. während BLE hängt)
+
+    def put(self, item):
+        """Befehl anhängen und den Consumer wecken - verdrängt bei vollem Kanal den ältesten"""
+        items = self._items
+        if len(items) == items.maxlen:
+            self.dropped += 1
+        items.append(item)
+        self._ready.set()
+        waker = self._waker
+        if waker:
+            waker()
+
+    def set_waker(self, waker):
+        """Zusätzlicher Weck-Callback für asyncio-Consumer (z.B. call_soon_threadsafe), None entfernt ihn"""
+        self._waker = waker
+
+    def get_nowait(self):
+        """Ältesten Befehl holen, queue.Empty wenn leer"""
+        try:
+            return self._items.popleft()
+        except IndexError:
+            raise Empty from None
+
+    def get(self, timeout=None):
+        """Blockiert bis ein Befehl da ist oder timeout abläuft (dann queue.Empty)"""
+        while True:
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+            self._ready.clear()
+            # Producer kann zwischen popleft und clear angehängt haben
+            if self._items:
+                continue
+            if not self._ready.wait(timeout):
+                raise Empty
@@ -6,18 +6,53 @@ Installiere zuerst: pip install bleak keyboard
 
 import asyncio
 import keyboard
+import sys
 import time
 from bleak import BleakClient, BleakScanner
 
+# Optional: uvloop (libuv) als schnellerer Event Loop - unter Windows nicht verfügbar
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Unter Windows Tastenzustand direkt abfragen statt über keyboard-Hooks
+if sys.platform == "win32":
+    import ctypes
+    _get_async_key_state = ctypes.windll.user32.GetAsyncKeyState
+else:
+    _get_async_key_state = None
+
+# Virtual-Key-Codes -> Aktion
+_VK_ACTIONS = (
+    (0x26, 'f'),      # Pfeil HOCH
+    (0x28, 'b'),      # Pfeil RUNTER
+    (0x25, 'l'),      # Pfeil LINKS
+    (0x27, 'i'),      # Pfeil RECHTS
+    (0x20, 'pause'),  # LEERTASTE
+    (0x4C, 'led'),    # L
+    (0x53, 'stop'),   # S
+    (0x1B, 'quit'),   # ESC
+    (0x51, 'quit'),   # Q
+)
+
+# Richtungsumkehr - nur hier ist der Zwischenstopp gegen Umkippen nötig
+_REVERSALS = {('f', 'b'), ('b', 'f'), ('l', 'i'), ('i', 'l')}
+
 class ElegooTumbllerController:
     def __init__(self):
         self.device_name = "CPS-45"  # Dein umbenanntes Gerät
         self.write_characteristic = "0000ffe2-0000-1000-8000-00805f9b34fb"
+        self.write_response = False  # Write-without-response, falls unterstützt
         self.client = None
         self.connected = False
         self.running = True
         self.loop = None
         self.is_moving = False  # Bewegungsstatus verfolgen
+        self._last_direction = None  # Zuletzt gesendete Fahrtrichtung
+        self._pending_direction = None  # Von den Hotkeys angeforderte Fahrtrichtung
+        self._key_state = 0  # Bitmap der zuletzt gedrückten Tasten (Polling)
+        self._tasks = set()  # Laufende Hotkey-Tasks - der Event Loop referenziert Tasks nur schwach
 
     async def connect(self):
         """Verbindung zum Elegoo Tumbller herstellen"""
@@ -34,6 +69,10 @@ class ElegooTumbllerController:
             self.client = BleakClient(device)
             await self.client.connect()
             self.connected = True
+            
+            # Write-without-response nur nutzen, wenn die Characteristic es anbietet
+            char = self.client.services.get_characteristic(self.write_characteristic)
+            self.write_response = not (char and 'write-without-response' in char.properties)
             print(f"✅ Erfolgreich verbunden mit {self.device_name}")
             return True
             
@@ -51,7 +90,8 @@ class ElegooTumbllerController:
             # ASCII-Befehl als Byte senden (wie ursprünglich)
             await self.client.write_gatt_char(
                 self.write_characteristic, 
-                command.encode('ascii')
+                command.encode('ascii'),
+                response=self.write_response
             )
             print(f"✅ Befehl '{command}' gesendet")
             return True
@@ -61,38 +101,60 @@ class ElegooTumbllerController:
             
     async def stop_and_move(self, direction):
         """Erst stoppen, dann bewegen (verhindert Umkippen)"""
-        if self.is_moving:
-            await self.send_command('s')  # Erst stoppen
-            await asyncio.sleep(0.1)      # Kurze Pause
+        if direction == self._last_direction:
+            return True  # Richtung bereits aktiv - kein erneuter BLE-Write
+
+        if self.is_moving and (self._last_direction, direction) in _REVERSALS:
+            # Erst stoppen - schlägt das fehl, Richtung nicht als umgesetzt merken (Dispatcher versucht es erneut)
+            if not await self.send_command('s'):
+                return False
+            self.is_moving = False
+            self._last_direction = None
+            await asyncio.sleep(0.02)     # Ca. ein BLE-Verbindungsintervall
             
-        await self.send_command(direction)  # Dann neuen Befehl
+        # Dann neuen Befehl - Zustand nur bei erfolgreichem Write übernehmen
+        if not await self.send_command(direction):
+            return False
         self.is_moving = True
+        self._last_direction = direction
+        return True
         
+    async def _send_stop(self):
+        """Stopp senden - Zustand nur bei erfolgreichem Write zurücksetzen"""
+        # Während des Writes gedrückte Richtungstaste nicht verwerfen
+        pending = self._pending_direction
+        if not await self.send_command('s'):
+            return False
+        self.is_moving = False
+        self._last_direction = None
+        if self._pending_direction == pending:
+            self._pending_direction = None
+        return True
+
     async def stop_robot(self):
         """Robot explizit stoppen"""
-        await self.send_command('s')
-        self.is_moving = False
-        print("🛑 Robot gestoppt")
+        if await self._send_stop():
+            print("🛑 Robot gestoppt")
         
     async def forward(self):
         """Vorwärts fahren"""
-        await self.stop_and_move('f')
-        print("⬆️ Vorwärts")
+        if await self.stop_and_move('f'):
+            print("⬆️ Vorwärts")
         
     async def backward(self):
         """Rückwärts fahren"""
-        await self.stop_and_move('b')
-        print("⬇️ Rückwärts")
+        if await self.stop_and_move('b'):
+            print("⬇️ Rückwärts")
         
     async def left(self):
         """Links drehen"""
-        await self.stop_and_move('l')
-        print("⬅️ Links")
+        if await self.stop_and_move('l'):
+            print("⬅️ Links")
         
     async def right(self):
         """Rechts drehen"""
-        await self.stop_and_move('i')
-        print("➡️ Rechts")
+        if await self.stop_and_move('i'):
+            print("➡️ Rechts")
         
     async def toggle_led(self):
         """LED ein/ausschalten"""
@@ -101,28 +163,85 @@ class ElegooTumbllerController:
         
     async def pause_robot(self):
         """Roboter pausieren (sanfter als stoppen)"""
-        if self.is_moving:
-            await self.send_command('s')
-            self.is_moving = False
+        if self.is_moving and await self._send_stop():
             print("⏸️ Roboter pausiert")
+
+    def request_direction(self, direction):
+        """Merkt die gewünschte Fahrtrichtung vor (aus dem Hotkey-Thread)"""
+        self._pending_direction = direction
+
+    async def direction_dispatcher(self):
+        """Setzt die zuletzt angeforderte Richtung um - gesendet wird nur bei Änderung"""
+        actions = {
+            'f': self.forward,
+            'b': self.backward,
+            'l': self.left,
+            'i': self.right
+        }
+        while self.running:
+            direction = self._pending_direction
+            if direction is not None and direction != self._last_direction:
+                await actions[direction]()
+            await asyncio.sleep(0.02)
         
+    def _spawn(self, coro):
+        """Task starten und bis zum Ende festhalten (nur im Event-Loop-Thread aufrufen)"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        """Referenz freigeben und Fehler ausgeben statt sie zu verschlucken"""
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Fehler in Hotkey-Aktion: {task.exception()}")
+
     def schedule_coroutine(self, coro):
         """Thread-sichere Ausführung von Coroutines"""
         if self.loop and not self.loop.is_closed():
-            asyncio.run_coroutine_threadsafe(coro, self.loop)
+            # Kein concurrent.futures.Future nötig - _spawn hält den Task bis zum Ende fest
+            self.loop.call_soon_threadsafe(self._spawn, coro)
         
     def setup_hotkeys(self):
         """Tastatur-Hotkeys einrichten"""
-        keyboard.add_hotkey('up', lambda: self.schedule_coroutine(self.forward()))
-        keyboard.add_hotkey('down', lambda: self.schedule_coroutine(self.backward()))
-        keyboard.add_hotkey('left', lambda: self.schedule_coroutine(self.left()))
-        keyboard.add_hotkey('right', lambda: self.schedule_coroutine(self.right()))
+        # Richtungstasten nur vormerken - der Dispatcher fasst Autorepeat zusammen
+        keyboard.add_hotkey('up', lambda: self.request_direction('f'))
+        keyboard.add_hotkey('down', lambda: self.request_direction('b'))
+        keyboard.add_hotkey('left', lambda: self.request_direction('l'))
+        keyboard.add_hotkey('right', lambda: self.request_direction('i'))
         keyboard.add_hotkey('space', lambda: self.schedule_coroutine(self.pause_robot()))
         keyboard.add_hotkey('l', lambda: self.schedule_coroutine(self.toggle_led()))
         keyboard.add_hotkey('s', lambda: self.schedule_coroutine(self.stop_robot()))
         keyboard.add_hotkey('esc', self.quit)
         keyboard.add_hotkey('q', self.quit)
         
+    def poll_keys(self):
+        """Tastenzustand abfragen und nur auf neu gedrückte Tasten reagieren"""
+        pressed = 0
+        for bit, (vk, _) in enumerate(_VK_ACTIONS):
+            if _get_async_key_state(vk) & 0x8000:
+                pressed |= 1 << bit
+                
+        edges = pressed & ~self._key_state
+        self._key_state = pressed
+        if not edges:
+            return
+            
+        for bit, (_, action) in enumerate(_VK_ACTIONS):
+            if not edges & (1 << bit):
+                continue
+            if action in ('f', 'b', 'l', 'i'):
+                self.request_direction(action)
+            elif action == 'pause':
+                self._spawn(self.pause_robot())
+            elif action == 'led':
+                self._spawn(self.toggle_led())
+            elif action == 'stop':
+                self._spawn(self.stop_robot())
+            elif action == 'quit':
+                self.quit()
+        
     def quit(self):
         """Programm beenden"""
         print("\n🛑 Beende Programm...")
@@ -159,27 +278,43 @@ async def main():
     controller = ElegooTumbllerController()
     controller.loop = asyncio.get_running_loop()
     
+    # Tasks laufen bis zum ersten echten await sofort - spart einen Scheduler-Durchlauf
+    if sys.version_info >= (3, 12):
+        controller.loop.set_task_factory(asyncio.eager_task_factory)
+    
     if not await controller.connect():
         input("Drücke Enter zum Beenden...")
         return
         
-    controller.setup_hotkeys()
+    if _get_async_key_state:
+        poll_interval = 0.005  # Direktes Polling - minimale Eingabelatenz
+    else:
+        controller.setup_hotkeys()
+        poll_interval = 0.1
     controller.print_instructions()
+    dispatcher = asyncio.create_task(controller.direction_dispatcher())
     
     try:
         while controller.running and controller.connected:
-            await asyncio.sleep(0.1)
+            if _get_async_key_state:
+                controller.poll_keys()
+            await asyncio.sleep(poll_interval)
     except KeyboardInterrupt:
         print("\n🛑 Programm durch Strg+C beendet")
     finally:
-        keyboard.unhook_all_hotkeys()
+        dispatcher.cancel()
+        if not _get_async_key_state:
+            keyboard.unhook_all_hotkeys()
         await controller.disconnect()
         print("👋 Auf Wiedersehen!")
 
 if __name__ == "__main__":
     print("🚀 Starte Elegoo Tumbller Controller (ASCII-Befehle)...")
     try:
-        asyncio.run(main())
+        if uvloop:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except Exception as e:
         print(f"💥 Unerwarteter Fehler: {e}")
         input("Drücke Enter zum Beenden...")
@@ -1,17 +1,110 @@
 import json
 import paho.mqtt.client as mqtt
 import logging
+import re
+import threading
 import time
+from collections import deque
+
+# Optional: orjson parst bytes direkt und deutlich schneller als json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Beide Parser akzeptieren bytes - kein zusätzliches decode() nötig
+_json_loads = orjson.loads if orjson else json.loads
+# orjson liefert direkt UTF-8 bytes, json einen str - paho akzeptiert beides
+_json_dumps = orjson.dumps if orjson else json.dumps
+
+# Festes DWM-Topic-Schema: dwm/node/<node_id>/uplink/location
+DWM_LOCATION_TOPIC = "dwm/node/+/uplink/location"
+
+# Extraktoren für die bekannten Payload-Strukturen
+def _extract_location_position(payload):
+    # Struktur 1: {"location": {"position": {...}}}
+    return payload["location"]["position"]
+
+def _extract_position(payload):
+    # Struktur 2: {"position": {...}}
+    return payload["position"]
+
+def _extract_xyz(payload):
+    # Struktur 3: Direktes x,y,z Format
+    return {"x": payload["x"], "y": payload["y"], "z": payload["z"]}
+
+def _extract_coordinates(payload):
+    # Struktur 4: Nested coordinates
+    coords = payload["coordinates"]
+    return {"x": coords["x"], "y": coords["y"], "z": coords["z"]}
+
+_FAST_KEYS = (b'"x":', b'"y":', b'"z":')
+
+def _fast_extract_dwm(raw):
+    """
+    Liest x, y, z direkt aus den Payload-Bytes, ohne das JSON-Objekt aufzubauen.
+    Nur für das feste DWM-Schema gedacht - liefert None, sobald etwas nicht passt.
+    """
+    values = []
+    start = 0
+    for key in _FAST_KEYS:
+        p = raw.find(key, start)
+        if p < 0:
+            return None
+        p += 4
+        end = raw.find(b',', p)
+        brace = raw.find(b'}', p)
+        if end < 0 or (0 <= brace < end):
+            end = brace
+        if end < 0:
+            return None
+        try:
+            values.append(float(raw[p:end]))
+        except ValueError:
+            return None
+        start = end
+    return {"x": values[0], "y": values[1], "z": values[2]}
+
+def _detect_extractor(payload):
+    """Erkennt die Payload-Struktur und liefert den passenden Extraktor (oder None)"""
+    if "location" in payload and type(payload["location"]) is dict:
+        if "position" in payload["location"]:
+            return _extract_location_position
+        return None
+    
+    if "position" in payload:
+        return _extract_position
+    
+    if all(key in payload for key in ["x", "y", "z"]):
+        return _extract_xyz
+    
+    if "coordinates" in payload and type(payload["coordinates"]) is dict:
+        coords = payload["coordinates"]
+        if all(key in coords for key in ["x", "y", "z"]):
+            return _extract_coordinates
+    
+    return None
+
+# Mögliche ID-Felder im Payload, in Prioritätsreihenfolge
+_ID_FIELDS = ("node_id", "id", "device_id", "tag_id", "node", "source")
 
 # Logger für bessere Diagnose
 logger = logging.getLogger('LocationMQTT')
 
 class LocationMQTT:
-    def __init__(self, broker, port, topic):
-        self.client = mqtt.Client()
+    _TOPIC_RE = re.compile(r'^dwm/node/([^/]+)/uplink/location$')
+
+    def __init__(self, broker, port, topic, tracked_only=False):
+        # Callback-API v2: keine Übersetzung der Legacy-Parameter pro Callback
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        # Größeres Inflight-Fenster, unbegrenzte Outgoing-Queue (0 = kein Limit)
+        self.client.max_inflight_messages_set(200)
+        self.client.max_queued_messages_set(0)
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
+        # DWM-Location-Topics direkt an den spezialisierten Handler routen
+        self.client.message_callback_add(DWM_LOCATION_TOPIC, self._on_node_location)
         self.topic = topic
         self._location_callback = None
         self.connected = False
@@ -20,64 +113,77 @@ class LocationMQTT:
         
         # Tracking für spezifische Node-IDs
         self.tracked_nodes = {"4c87": "Tumbller", "0cad": "Target Person"}
-        self.last_position_update = {}
+        
+        # Opt-in: Nachrichten nicht getrackter Nodes vor dem JSON-Parsen verwerfen
+        self.tracked_only = tracked_only
+        self._tracked_topic_fragments = tuple(f"/{node_id}/" for node_id in self.tracked_nodes)
+        # Nächster erlaubter Ausgabezeitpunkt (monotonic) je getrackter Node
+        self._next_log_time = {node_id: 0.0 for node_id in self.tracked_nodes}
+        # Vorformatierte Ausgabe-Templates - pro Aufruf nur noch die drei Floats einsetzen
+        self._print_tmpl = {
+            node_id: f"🤖 {name} ({node_id}): x=%.3fm, y=%.3fm, z=%.3fm"
+            for node_id, name in self.tracked_nodes.items()
+        }
+        
+        # Spezialisierte Positions-Extraktion pro Node-ID, beim ersten Treffer festgelegt
+        self._extractor_cache = {}
+        # Byte-Schnellpfad je Node: None = noch ungeprüft, True/False = Ergebnis des Abgleichs
+        self._fast_nodes = {}
+        
+        # Publish-Puffer: ein Writer-Thread sendet Bursts gebündelt alle 10 ms
+        # (erst beim ersten publish() gestartet - ohne Publisher kein Leerlauf-Thread)
+        self.publish_flush_interval = 0.01
+        self._pub_queue = deque()
+        self._pub_event = threading.Event()
+        self._pub_lock = threading.Lock()  # schützt _pub_running/_pub_thread gegen stop()
+        self._pub_running = False
+        self._pub_thread = None
 
-    def _on_connect(self, client, userdata, flags, rc):
-        if rc == 0:
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        if not reason_code.is_failure:
             self.connected = True
-            logger.info(f"✅ MQTT verbunden: {mqtt.connack_string(rc)}")
+            logger.info(f"✅ MQTT verbunden: {reason_code}")
             logger.info(f"📡 Subscribing zu Topic: {self.topic}")
-            client.subscribe(self.topic)
+            if isinstance(self.topic, (list, tuple)):
+                # Mehrere Topics in einem einzigen SUBSCRIBE-Paket
+                client.subscribe([(topic, 0) for topic in self.topic])
+            else:
+                client.subscribe(self.topic)
         else:
             self.connected = False
-            logger.error(f"❌ MQTT Verbindung fehlgeschlagen: {mqtt.connack_string(rc)}")
+            logger.error(f"❌ MQTT Verbindung fehlgeschlagen: {reason_code}")
 
-    def _on_disconnect(self, client, userdata, rc):
+    def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         self.connected = False
-        logger.warning(f"⚠️ MQTT Verbindung getrennt: {rc}")
+        logger.warning(f"⚠️ MQTT Verbindung getrennt: {reason_code}")
 
     def _extract_node_id_from_topic(self, topic):
         """Extrahiert Node-ID nur aus validen Topic-Formaten"""
-        parts = topic.split('/')
-        
         # Validiere das erwartete Format: dwm/node/XXXX/uplink/location
-        if (len(parts) == 5 and 
-            parts[0] == "dwm" and 
-            parts[1] == "node" and 
-            parts[3] == "uplink" and 
-            parts[4] == "location"):
-            return parts[2]
-        
-        return None
+        match = self._TOPIC_RE.match(topic)
+        return match.group(1) if match else None
 
-    def _extract_position_from_payload(self, payload):
+    def _extract_position_from_payload(self, payload, node_id=None):
         """Extrahiert Position aus verschiedenen Payload-Strukturen"""
-        pos = None
-        
-        # Struktur 1: {"location": {"position": {...}}}
-        if "location" in payload and isinstance(payload["location"], dict):
-            if "position" in payload["location"]:
-                pos = payload["location"]["position"]
-        
-        # Struktur 2: {"position": {...}}
-        elif "position" in payload:
-            pos = payload["position"]
+        # Schnellpfad: Struktur ist pro Publisher (Node) stabil
+        extractor = self._extractor_cache.get(node_id)
+        if extractor:
+            try:
+                return extractor(payload)
+            except (KeyError, TypeError):
+                pass
         
-        # Struktur 3: Direktes x,y,z Format
-        elif all(key in payload for key in ["x", "y", "z"]):
-            pos = {"x": payload["x"], "y": payload["y"], "z": payload["z"]}
-        
-        # Struktur 4: Nested coordinates
-        elif "coordinates" in payload and isinstance(payload["coordinates"], dict):
-            coords = payload["coordinates"]
-            if all(key in coords for key in ["x", "y", "z"]):
-                pos = {"x": coords["x"], "y": coords["y"], "z": coords["z"]}
-        
-        return pos
+        # Struktur (neu) erkennen und Extraktor für diese Node merken
+        extractor = _detect_extractor(payload)
+        if not extractor:
+            self._extractor_cache.pop(node_id, None)
+            return None
+        self._extractor_cache[node_id] = extractor
+        return extractor(payload)
 
     def _validate_position(self, pos):
         """Validiert und konvertiert Position zu numerischen Werten"""
-        if not pos or not isinstance(pos, dict):
+        if not pos or type(pos) is not dict:
             return None
             
         try:
@@ -92,67 +198,94 @@ class LocationMQTT:
 
     def _log_tracked_position(self, node_id, position):
         """Spezielle Ausgabe für getrackte Node-IDs"""
-        current_time = time.time()
+        # None = nicht getrackt; sonst höchstens alle 2 Sekunden ausgeben
+        deadline = self._next_log_time.get(node_id)
+        if deadline is None or not logger.isEnabledFor(logging.INFO):
+            return
         
-        if node_id in self.tracked_nodes:
-            device_name = self.tracked_nodes[node_id]
-            
-            # Prüfe ob genug Zeit seit letztem Update vergangen ist (alle 2 Sekunden)
-            if (node_id not in self.last_position_update or 
-                current_time - self.last_position_update[node_id] >= 2.0):
-                
-                print(f"🤖 {device_name} ({node_id}): x={position['x']:.3f}m, y={position['y']:.3f}m, z={position['z']:.3f}m")
-                self.last_position_update[node_id] = current_time
+        now = time.monotonic()
+        if now >= deadline:
+            # Lazy %-Formatierung - main.py reicht den Record unformatiert an den Listener-Thread weiter
+            logger.info(self._print_tmpl[node_id], position['x'], position['y'], position['z'])
+            self._next_log_time[node_id] = now + 2.0
 
-    def _on_message(self, client, userdata, msg):
+    def _on_node_location(self, client, userdata, msg):
+        """Spezialisierter Handler für DWM-Location-Topics - Node-ID steht im Topic"""
         try:
-            payload = json.loads(msg.payload.decode())
-
-            # Node-ID Extraktion mit verbesserter Prioritätslogik
-            node_id = None
+            node_id = msg.topic.split('/', 3)[2]
+            if self.tracked_only and node_id not in self.tracked_nodes:
+                return
             
-            # Priorität 1: Node-ID aus Payload extrahieren
-            if "node_id" in payload:
-                node_id = str(payload["node_id"])
+            raw = msg.payload
+            fast_nodes = self._fast_nodes
+            fast = fast_nodes.get(node_id)
+            if fast:
+                pos = _fast_extract_dwm(raw)
+                if pos is not None:
+                    self._deliver_position(node_id, pos)
+                    return
+                # Schema hat sich geändert - beim nächsten Mal neu abgleichen
+                fast_nodes[node_id] = None
             
-            # Priorität 2: Node-ID aus Topic extrahieren (nur bei validem Format)
-            if not node_id:
-                extracted_id = self._extract_node_id_from_topic(msg.topic)
-                if extracted_id:
-                    node_id = extracted_id
+            payload = _json_loads(raw)
+            pos = self._process_payload(node_id, payload)
+            if fast is None:
+                # Schnellpfad nur freischalten, wenn er exakt dasselbe Ergebnis liefert
+                fast_nodes[node_id] = pos is not None and _fast_extract_dwm(raw) == pos
+
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError ist eine Unterklasse
+            logger.error(f"❌ JSON Parse Fehler: {e}")
             
-            # Priorität 3: Andere mögliche ID-Felder in Payload
-            if not node_id:
-                for id_field in ["id", "device_id", "tag_id", "node", "source"]:
-                    if id_field in payload:
-                        node_id = str(payload[id_field])
-                        break
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Verarbeiten der MQTT-Nachricht: {e}")
+
+    def _on_message(self, client, userdata, msg):
+        """Generischer Fallback für alle übrigen Topics"""
+        topic = msg.topic
+        if self.tracked_only and not any(f in topic for f in self._tracked_topic_fragments):
+            return
+        
+        try:
+            # Priorität 1: Node-ID aus Topic (reiner String-Match, nur bei validem Format)
+            node_id = self._extract_node_id_from_topic(topic)
             
-            # Fallback: Verwende "unknown" als Node-ID
+            payload = _json_loads(msg.payload)
+
+            # Priorität 2: ID-Felder im Payload, Fallback "unknown"
             if not node_id:
-                node_id = "unknown"
+                node_id = next((str(payload[f]) for f in _ID_FIELDS if f in payload), "unknown")
 
-            # Position extrahieren
-            pos = self._extract_position_from_payload(payload)
-            
-            if pos:
-                # Position validieren
-                validated_pos = self._validate_position(pos)
-                
-                if validated_pos:
-                    # Spezielle Ausgabe für getrackte Nodes
-                    self._log_tracked_position(node_id, validated_pos)
-                    
-                    # Callback ausführen
-                    if self._location_callback:
-                        self._location_callback(node_id, validated_pos)
-
-        except json.JSONDecodeError as e:
+            self._process_payload(node_id, payload)
+
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeError ist eine Unterklasse
             logger.error(f"❌ JSON Parse Fehler: {e}")
             
         except Exception as e:
             logger.error(f"❌ Fehler beim Verarbeiten der MQTT-Nachricht: {e}")
 
+    def _process_payload(self, node_id, payload):
+        """Position extrahieren, validieren und weitergeben - liefert die validierte Position"""
+        pos = self._extract_position_from_payload(payload, node_id)
+        
+        if pos:
+            # Position validieren
+            validated_pos = self._validate_position(pos)
+            
+            if validated_pos:
+                self._deliver_position(node_id, validated_pos)
+                return validated_pos
+        return None
+
+    def _deliver_position(self, node_id, position):
+        """Ausgabe für getrackte Nodes und Callback"""
+        # Spezielle Ausgabe für getrackte Nodes
+        self._log_tracked_position(node_id, position)
+        
+        # Callback ausführen
+        callback = self._location_callback
+        if callback:
+            callback(node_id, position)
+
     def set_location_callback(self, callback):
         """Register the consumer callback to receive node_id and pos dict."""
         self._location_callback = callback
@@ -165,6 +298,9 @@ class LocationMQTT:
             print(f"👀 Tracking: {', '.join([f'{name} ({id})' for id, name in self.tracked_nodes.items()])}")
             self.client.connect(broker, port, keepalive=60)
             self.client.loop_start()
+            
+            with self._pub_lock:
+                self._pub_running = True
         except Exception as e:
             logger.error(f"❌ Fehler beim Starten des MQTT Clients: {e}")
             raise
@@ -172,6 +308,16 @@ class LocationMQTT:
     def stop(self):
         """Stoppt den MQTT Client ordnungsgemäß"""
         try:
+            # Publish-Writer beenden und Restpuffer noch senden - nach dem Lock puffert
+            # publish() nicht mehr, alles bis dahin Gepufferte erfasst der letzte Flush
+            with self._pub_lock:
+                self._pub_running = False
+                pub_thread, self._pub_thread = self._pub_thread, None
+            self._pub_event.set()
+            if pub_thread:
+                pub_thread.join(timeout=1)
+            self._flush_publishes()
+            
             self.client.loop_stop()
             self.client.disconnect()
             self.connected = False
@@ -182,11 +328,55 @@ class LocationMQTT:
         """Prüft ob MQTT Client verbunden ist"""
         return self.connected
 
-    def publish(self, topic, message):
-        """Sende eine Nachricht über MQTT"""
+    def publish(self, topic, message, qos=0, retain=False):
+        """Sende eine Nachricht über MQTT (gepuffert, siehe _publish_worker)"""
+        # dict/list einmal serialisieren, bytes/str unverändert durchreichen
+        if isinstance(message, (dict, list)):
+            message = _json_dumps(message)
+        with self._pub_lock:
+            if self._pub_running:
+                if self._pub_thread is None:
+                    self._pub_thread = threading.Thread(target=self._publish_worker, daemon=True)
+                    self._pub_thread.start()
+                self._pub_queue.append((topic, message, qos, retain))
+                self._pub_event.set()
+                return
+        # Vor start() / nach stop() - direkt senden statt unbegrenzt puffern
+        self._send(topic, message, qos, retain)
+
+    def _publish_worker(self):
+        """Sammelt Publish-Bursts und sendet sie gebündelt"""
+        while self._pub_running:
+            self._pub_event.wait()
+            self._pub_event.clear()
+            time.sleep(self.publish_flush_interval)  # Burst sammeln
+            self._flush_publishes()
+
+    def _flush_publishes(self):
+        """Sendet den Puffer - bei QoS 0 ohne retain zählt pro Topic nur die neueste Nachricht"""
+        pending = {}
+        while True:
+            try:
+                entry = self._pub_queue.popleft()
+            except IndexError:
+                break
+            topic, _, qos, retain = entry
+            if qos == 0 and not retain:
+                # Ältere Fire-and-forget Nachricht verwerfen, neueste rückt ans Ende
+                pending.pop(topic, None)
+                pending[topic] = entry
+            else:
+                # QoS>0 / retained: jede Nachricht zählt, Reihenfolge beibehalten
+                pending[object()] = entry
+        
+        for topic, message, qos, retain in pending.values():
+            self._send(topic, message, qos, retain)
+
+    def _send(self, topic, message, qos, retain):
+        """Sendet eine einzelne Nachricht, falls verbunden"""
         try:
             if self.connected:
-                self.client.publish(topic, message)
+                self.client.publish(topic, message, qos=qos, retain=retain)
             else:
                 logger.error("❌ Kann nicht senden - MQTT nicht verbunden")
         except Exception as e:
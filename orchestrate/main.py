@@ -3,10 +3,10 @@
 import threading
 import time
 import logging
+import logging.handlers
 import sys
 import os
-from concurrent.futures import ThreadPoolExecutor
-from queue import Queue
+from queue import Queue, SimpleQueue, Empty, Full
 import signal
 import asyncio
 
@@ -19,50 +19,198 @@ except ImportError as e:
     MQTT_AVAILABLE = False
     print(f"paho-mqtt Import Fehler: {e}")
 
+# Optional: uvloop (libuv) für den BLE Event Loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Projektpfade hinzufügen
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(current_dir)
 sys.path.append(parent_dir)
 
+from command_channel import CommandChannel
+
 # Konfiguriere Logging
+# Worker-Threads legen Records nur in eine Queue - stdout-I/O übernimmt der Listener-Thread.
+# Die Formatierung (%-Merge, Traceback) ebenfalls, weil prepare() Records unformatiert durchreicht
+class _DropOldestQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler für eine begrenzte Queue - bei Überlauf fliegt der älteste Record raus"""
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Standard-prepare() formatiert im aufrufenden Thread (MQTT-Callback, BLE-Worker).
+        # Records bleiben im Prozess, daher unverändert weiterreichen - die Log-Argumente
+        # sind unveränderliche Werte, der Listener-Thread formatiert sie später
+        return record
+
+    def enqueue(self, record):
+        # Nie blockieren: ein hängendes stdout darf MQTT-Callback/BLE-Worker nicht ausbremsen
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                pass
+            self.dropped += 1
+            try:
+                self.queue.put_nowait(record)
+            except Full:
+                self.dropped += 1  # Wettlauf mit anderem Producer - diesen Record verwerfen
+
+
+class _BoundedQueueListener(logging.handlers.QueueListener):
+    """QueueListener, dessen Stop-Sentinel auch bei voller Queue ankommt"""
+
+    def enqueue_sentinel(self):
+        # Blockierend - der Listener-Thread leert die Queue weiter und macht Platz
+        self.queue.put(self._sentinel)
+
+
+_log_queue = Queue(maxsize=1024)
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+_log_listener = _BoundedQueueListener(_log_queue, _log_stream_handler)
+_log_queue_handler = _DropOldestQueueHandler(_log_queue)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[_log_queue_handler]
 )
+# Listener-Thread startet erst mit den Services (start_all_services) - ein Import allein startet keinen Thread
 
 logger = logging.getLogger('UWBuddy-Orchestrator')
 
+# Getrackte UWB-Tags
+DEVICE_NAMES = {"4c87": "Tumbller", "0cad": "Target Person"}
+
+# Anzeigenamen der BLE-Befehle - einmal auf Modulebene statt pro Schleifendurchlauf
+# ('i' ist das Rechts-Kommando des Elegoo-Controllers, 'r' bleibt als Alias)
+_COMMAND_NAMES = {
+    'f': 'FORWARD',
+    's': 'STOP',
+    'l': 'LEFT',
+    'i': 'RIGHT',
+    'r': 'RIGHT',
+    'b': 'BACKWARD'
+}
+
+def _cpus_from_env(name):
+    """
+    Liest eine Kernliste aus der Umgebung, z.B. UWBUDDY_BLE_CPUS="1" oder "2,3".
+    Nicht gesetzt oder ungültig -> None (kein Pinning, Standardverhalten).
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        return {int(core) for core in value.split(",")}
+    except ValueError:
+        logger.warning(f"{name}={value!r} ignoriert - erwartet kommagetrennte Kernnummern")
+        return None
+
+def _pin_thread(thread, cpus, realtime=False):
+    """
+    Pinnt einen Thread auf die angegebenen Kerne (nur Linux). thread=None meint den aufrufenden Thread.
+    Opt-in: ohne Kerne (cpus=None) passiert nichts. Neu erzeugte Threads erben Affinität und
+    Scheduling-Policy - daher Kind-Threads vorher starten oder gezielt per thread pinnen.
+    realtime=True versucht zusätzlich SCHED_FIFO - braucht CAP_SYS_NICE, sonst ohne.
+    """
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return
+    tid = 0 if thread is None else thread.native_id  # 0 = aufrufender Thread
+    if tid is None:
+        return  # Thread noch nicht gestartet
+    try:
+        os.sched_setaffinity(tid, cpus)
+    except OSError as e:
+        logger.debug(f"CPU-Affinität nicht gesetzt: {e}")
+        return
+    if realtime:
+        try:
+            os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(10))
+        except (OSError, AttributeError) as e:
+            logger.debug(f"SCHED_FIFO nicht verfügbar: {e}")
+
 class UWBuddyOrchestrator:
     """
     Hauptorchestrator für das UWBuddy System
     """
     def __init__(self):
-        self.running = True
+        # Gesetzt beim Shutdown - einziges Stop-Signal, Worker warten darauf statt in Sleep-Schleifen
+        self._shutdown = threading.Event()
         self.threads = {}
-        self.message_queue = Queue()
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # Worker melden ihr Ende hier (SimpleQueue.put ist auch im Signal-Handler sicher)
+        self._thread_exits = SimpleQueue()
+        # Getrennte Queues: jeder Consumer blockiert nur auf seiner eigenen
+        self.robot_cmd_queue = CommandChannel()  # Steering Controller -> BLE Worker (SPSC), reine Befehls-Dicts
+        self.logic_event_queue = SimpleQueue()  # Fehler/Status -> Logic Worker (MPSC, kein maxsize nötig)
+        # Entprellung identischer BLE-Befehle
+        self._last_sent_command = None
+        self._last_send_ts = 0.0
         self.robot_controller = None
         self.digital_twin = None
         self.mqtt_client = None
+        self.steering_controller = None
+        self._ble_loop = None
+        self._log_listener_running = False
 
     def signal_handler(self, signum, frame):
         """Behandelt Shutdown-Signale"""
         logger.info("Shutdown-Signal erhalten. Stoppe alle Threads...")
-        self.running = False
+        self._shutdown.set()
+        self._thread_exits.put(None)  # Monitor sofort wecken
+
+    def _make_thread(self, name, target):
+        """Worker-Thread, der sein Ende (auch per Exception) an den Monitor meldet"""
+        def runner():
+            try:
+                target()
+            finally:
+                self._thread_exits.put(name)
+        return threading.Thread(target=runner, name=name, daemon=True)
+
+    def _drain_robot_commands(self, item):
+        """Leert die Befehls-Queue und liefert nur den neuesten Befehl - ältere sind überholt.
+        None (Shutdown-Sentinel) hat Vorrang vor allen Befehlen."""
+        while item is not None:
+            try:
+                item = self.robot_cmd_queue.get_nowait()
+            except Empty:
+                return item
+        return None
+
+    def _is_redundant_command(self, command, debounce=1.0):
+        """True wenn derselbe Befehl innerhalb des Entprell-Fensters schon gesendet wurde"""
+        now = time.monotonic()
+        if command == self._last_sent_command and now - self._last_send_ts < debounce:
+            return True
+        self._last_sent_command = command
+        self._last_send_ts = now
+        return False
 
     def start_ble_service(self):
         """Startet den BLE Service mit echtem Controller"""
         def ble_worker():
             print("BLE Service gestartet")
+            # Opt-in: UWBUDDY_BLE_CPUS (Kerne), UWBUDDY_BLE_REALTIME=1 (SCHED_FIFO, kann den Rest aushungern)
+            _pin_thread(None, _cpus_from_env("UWBUDDY_BLE_CPUS"),
+                        realtime=os.environ.get("UWBUDDY_BLE_REALTIME") == "1")
             try:
                 from elegoo_controller import ElegooTumbllerController
 
                 self.robot_controller = ElegooTumbllerController()
                 print("BLE Controller initialisiert")
 
-                # Asyncio Event Loop für BLE-Verbindung
-                loop = asyncio.new_event_loop()
+                # Asyncio Event Loop für BLE-Verbindung (uvloop falls installiert)
+                loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
                 
                 # Verbindung herstellen
@@ -73,76 +221,105 @@ class UWBuddyOrchestrator:
                     if connected:
                         print("BLE Controller erfolgreich verbunden")
                         self.robot_controller.connected = True
+                        self.logic_event_queue.put(("status", "ble", "verbunden"))
                     else:
                         print("BLE Controller Verbindung fehlgeschlagen - Simulations-Modus")
                         self.robot_controller.connected = False
+                        self.logic_event_queue.put(("status", "ble", "Simulations-Modus"))
                 except Exception as e:
-                    print(f"BLE Verbindungsfehler: {e}")
                     print("BLE Service läuft im Simulations-Modus")
+                    self.logic_event_queue.put(("error", "ble", f"Verbindungsfehler: {e}"))
                     self.robot_controller.connected = False
                     connected = False
 
-                while self.running:
-                    # Verarbeite Nachrichten aus der Queue für Roboter-Befehle
-                    try:
-                        if not self.message_queue.empty():
-                            message_type, service, data = self.message_queue.get_nowait()
-                            if message_type == "robot_command":
-                                command = data.get('command', '')
-                                reason = data.get('reason', 'unknown')
-                                
-                                command_names = {
-                                    'f': 'FORWARD',
-                                    's': 'STOP',
-                                    'l': 'LEFT',
-                                    'r': 'RIGHT',
-                                    'b': 'BACKWARD'
-                                }
-                                command_name = command_names.get(command, f'UNKNOWN({command})')
-                                
-                                if connected and hasattr(self.robot_controller, 'send_command'):
-                                    print(f"Bluetooth -> Tumbller: {command_name} (Grund: {reason})")
-                                    try:
-                                        # Async Befehl senden
-                                        loop.run_until_complete(self.robot_controller.send_command(command))
-                                    except Exception as e:
-                                        print(f"Bluetooth Sendefehler: {e}")
-                                        connected = False
-                                        self.robot_controller.connected = False
-                                else:
-                                    print(f"Bluetooth (SIM) -> Tumbller: {command_name} (Grund: {reason})")
-                    except Exception as e:
-                        pass
-                    
-                    time.sleep(0.1)  # Schnelle Queue-Verarbeitung
+                # Persistenter Loop: ein Pump-Task statt run_until_complete pro Befehl
+                wake = asyncio.Event()
+                self.robot_cmd_queue.set_waker(lambda: loop.call_soon_threadsafe(wake.set))
+
+                async def pump():
+                    nonlocal connected
+                    while not self._shutdown.is_set():
+                        try:
+                            item = self.robot_cmd_queue.get_nowait()
+                        except Empty:
+                            # Neuer Befehl/Sentinel weckt sofort, Timeout nur als Rückfall für den Shutdown-Check
+                            wake.clear()
+                            try:
+                                await asyncio.wait_for(wake.wait(), timeout=1.0)
+                            except asyncio.TimeoutError:
+                                pass
+                            continue
+                        # Aufgestaute Befehle zusammenfassen - nur der letzte zählt
+                        data = self._drain_robot_commands(item)
+                        if data is None:
+                            break  # Shutdown-Sentinel
+
+                        try:
+                            command = data.get('command', '')
+                            reason = data.get('reason', 'unknown')
+                            if self._is_redundant_command(command):
+                                continue
+
+                            command_name = _COMMAND_NAMES.get(command, f'UNKNOWN({command})')
+
+                            if connected and hasattr(self.robot_controller, 'send_command'):
+                                logger.info("Bluetooth -> Tumbller: %s (Grund: %s)", command_name, reason)
+                                try:
+                                    # send_command meldet Fehler per False statt Exception -
+                                    # dann gilt der Befehl nicht als gesendet, eine Wiederholung darf sofort raus
+                                    if not await self.robot_controller.send_command(command):
+                                        self._last_sent_command = None
+                                except Exception as e:
+                                    self.logic_event_queue.put(("error", "ble", f"Sendefehler: {e}"))
+                                    self._last_sent_command = None
+                                    connected = False
+                                    self.robot_controller.connected = False
+                            else:
+                                logger.info("Bluetooth (SIM) -> Tumbller: %s (Grund: %s)", command_name, reason)
+                        except (AttributeError, TypeError):
+                            # Nur ein fehlerhafter Eintrag (kein Befehls-Dict) - Sendefehler fängt der innere Handler
+                            logger.warning("Ungültiger BLE-Befehl verworfen: %r", data)
+                    loop.stop()
+
+                self._ble_loop = loop
+                pump_task = loop.create_task(pump())
+                try:
+                    loop.run_forever()
+                finally:
+                    self.robot_cmd_queue.set_waker(None)
+                    self._ble_loop = None
+                    if not pump_task.done():
+                        pump_task.cancel()
+                        loop.run_until_complete(asyncio.gather(pump_task, return_exceptions=True))
+                    loop.close()
 
             except ImportError as e:
                 print(f"BLE Module nicht gefunden: {e}")
                 print("BLE Service läuft im Simulations-Modus")
                 
                 # Simulation mit Ausgabe
-                while self.running:
+                while not self._shutdown.is_set():
                     try:
-                        if not self.message_queue.empty():
-                            message_type, service, data = self.message_queue.get_nowait()
-                            if message_type == "robot_command":
-                                command = data.get('command', '')
-                                reason = data.get('reason', 'unknown')
-                                
-                                command_names = {
-                                    'f': 'FORWARD',
-                                    's': 'STOP',
-                                    'l': 'LEFT',
-                                    'r': 'RIGHT',
-                                    'b': 'BACKWARD'
-                                }
-                                command_name = command_names.get(command, f'UNKNOWN({command})')
-                                print(f"Bluetooth (SIM) -> Tumbller: {command_name} (Grund: {reason})")
-                    except Exception as e:
-                        pass
-                    time.sleep(0.1)
-
-        return threading.Thread(target=ble_worker, daemon=True)
+                        item = self.robot_cmd_queue.get(timeout=1.0)
+                    except Empty:
+                        continue
+                    # Aufgestaute Befehle zusammenfassen - nur der letzte zählt
+                    data = self._drain_robot_commands(item)
+                    if data is None:
+                        break  # Shutdown-Sentinel
+
+                    try:
+                        command = data.get('command', '')
+                        reason = data.get('reason', 'unknown')
+                        if self._is_redundant_command(command):
+                            continue
+
+                        command_name = _COMMAND_NAMES.get(command, f'UNKNOWN({command})')
+                        logger.info("Bluetooth (SIM) -> Tumbller: %s (Grund: %s)", command_name, reason)
+                    except (AttributeError, TypeError):
+                        logger.warning("Ungültiger BLE-Befehl verworfen: %r", data)
+
+        return self._make_thread('ble', ble_worker)
 
     def start_mqtt_service(self):
         """Startet den MQTT Service mit Digital Twin und Steering Controller"""
@@ -168,45 +345,50 @@ class UWBuddyOrchestrator:
 
                 # MQTT Client starten
                 broker_ip = "orehek_wlan-usb-001.iot.private.hm.edu"
-                self.mqtt_client = LocationMQTT(broker_ip, 1883, "dwm/node/+/uplink/location")
+                # Nur die getrackten Tags (DEVICE_NAMES) abonnieren - der Broker filtert den Rest
+                topics = [f"dwm/node/{node_id}/uplink/location" for node_id in DEVICE_NAMES]
+                self.mqtt_client = LocationMQTT(broker_ip, 1883, topics)
                 self.mqtt_client.set_location_callback(self.process_position)
                 self.mqtt_client.start(broker_ip, 1883)
+                # Opt-in: nur paho's Netzwerk-Thread pinnen - dieser Worker bleibt frei, damit
+                # Steering Controller & Co. die Affinität nicht erben
+                _pin_thread(getattr(self.mqtt_client.client, '_thread', None),
+                            _cpus_from_env("UWBUDDY_MQTT_CPUS"))
                 print(f"MQTT Client gestartet - Broker: {broker_ip}")
 
                 # Steering Controller mit direkter Message Queue Referenz
-                steering_controller = TumbllerSteeringController(
+                self.steering_controller = TumbllerSteeringController(
                     self.digital_twin,
-                    self.message_queue  # Direkte Referenz zur Message Queue
+                    self.robot_cmd_queue  # Direkte Referenz zur Roboter-Befehls-Queue
                 )
-                steering_controller.start(interval=0.5)
+                # Steering meldet sich beim Start selbst für Positions-Updates am Twin an (Rate-Limit entprellt)
+                self.steering_controller.start(interval=0.5)
                 print("Steering Controller mit Message Queue gestartet")
                 print("WICHTIG: Nur Steering Controller aktiv - keine alte Follow-Logic!")
                 
-                # Hauptschleife
-                while self.running:
-                    if not self.mqtt_client or not self.mqtt_client.is_connected():
-                        print("MQTT Verbindung verloren - versuche Reconnect...")
-                        time.sleep(5)
-                    time.sleep(1)
+                # Reconnects übernimmt paho's Netzwerk-Thread (loop_start) selbst und
+                # meldet Verbindungsverluste über _on_disconnect - hier nur bis zum Shutdown warten
+                self._shutdown.wait()
 
             except ImportError as e:
                 print(f"MQTT/Digital Twin Module nicht gefunden: {e}")
                 print("MQTT Service läuft im Simulations-Modus")
-                while self.running:
-                    time.sleep(1.5)
+                self._shutdown.wait()
 
             except Exception as e:
-                print(f"Fehler im MQTT Service: {e}")
+                self.logic_event_queue.put(("error", "mqtt", str(e)))
 
-        return threading.Thread(target=mqtt_worker, daemon=True)
+        return self._make_thread('mqtt', mqtt_worker)
 
     def process_position(self, node_id, pos):
         """Verarbeitet UWB-Positionsdaten"""
-        # Nur für getrackte Nodes ausgeben
-        if node_id in ["4c87", "0cad"]:
-            device_names = {"4c87": "Tumbller", "0cad": "Target Person"}
-            device_name = device_names.get(node_id, node_id)
-            print(f"{device_name} ({node_id}): x={pos.get('x', 0):.3f}m, y={pos.get('y', 0):.3f}m, z={pos.get('z', 0):.3f}m")
+        # Nur für getrackte Nodes ausgeben - Formatierung nur wenn DEBUG aktiv
+        # (LocationMQTT loggt getrackte Positionen bereits gedrosselt auf INFO)
+        device_name = DEVICE_NAMES.get(node_id)
+        if device_name and logger.isEnabledFor(logging.DEBUG):
+            # LocationMQTT liefert immer validierte x/y/z-Floats
+            logger.debug("%s (%s): x=%.3fm, y=%.3fm, z=%.3fm",
+                         device_name, node_id, pos['x'], pos['y'], pos['z'])
         
         # Position an Digital Twin weiterleiten
         if self.digital_twin:
@@ -217,71 +399,81 @@ class UWBuddyOrchestrator:
         def logic_worker():
             print("Logic Service gestartet (ohne Follow-Logic)")
             try:
-                while self.running:
+                while True:
                     # Verarbeite nur ANDERE Nachrichten, NICHT follow_command
-                    if not self.message_queue.empty():
+                    # Blockierend auf das erste Event warten, shutdown() weckt per None-Sentinel
+                    batch = [self.logic_event_queue.get()]
+                    # Alles bereits Wartende in einem Durchgang mitnehmen
+                    while True:
+                        try:
+                            batch.append(self.logic_event_queue.get_nowait())
+                        except Empty:
+                            break
+
+                    for entry in batch:
+                        if entry is None:
+                            return  # Shutdown-Sentinel
+                        message_type, service, data = entry
                         try:
-                            message_type, service, data = self.message_queue.get_nowait()
-                            
                             # WICHTIG: follow_command wird IGNORIERT - Steering Controller übernimmt das!
                             if message_type == "error":
-                                error_msg = data
-                                logger.error(f"Fehler von {service}: {error_msg}")
+                                logger.error(f"Fehler von {service}: {data}")
+                            elif message_type == "warning":
+                                logger.warning(f"Warnung von {service}: {data}")
                             elif message_type == "status":
-                                status_msg = data
-                                logger.info(f"Status von {service}: {status_msg}")
+                                logger.info(f"Status von {service}: {data}")
                             # Andere Message-Types können hier hinzugefügt werden
-                            
+
                         except Exception as e:
                             logger.error(f"Fehler bei Message-Verarbeitung: {e}")
                     
-                    time.sleep(0.5)
-                    
             except Exception as e:
                 logger.error(f"Fehler im Logic Service: {e}")
 
-        return threading.Thread(target=logic_worker, daemon=True)
-
-    def start_tumbller_service(self):
-        """Startet den Tumbller Service"""
-        def tumbller_worker():
-            print("Tumbller Service gestartet")
-            try:
-                while self.running:
-                    # Tumbller-spezifische Operationen
-                    if self.digital_twin:
-                        tumbller_state = self.digital_twin.get_tumbller_state()
-                        if tumbller_state:
-                            logger.debug(f"Tumbller Status: in_zone={tumbller_state.get('in_zone', False)}")
-                    
-                    time.sleep(2)
-
-            except Exception as e:
-                logger.error(f"Fehler im Tumbller Service: {e}")
-                self.message_queue.put(("error", "tumbller", str(e)))
-
-        return threading.Thread(target=tumbller_worker, daemon=True)
+        return self._make_thread('logic', logic_worker)
 
     def monitor_system(self):
         """Überwacht das System und behandelt Nachrichten"""
         print("System Monitor gestartet")
-        while self.running:
+        next_summary = time.monotonic() + 30
+        reported_drops = 0
+        reported_log_drops = 0
+        while not self._shutdown.is_set():
             try:
-                # Überprüfe Thread-Status
-                dead_threads = []
-                for name, thread in self.threads.items():
-                    if not thread.is_alive() and self.running:
-                        logger.warning(f"Thread {name} ist gestoppt!")
-                        dead_threads.append(name)
-
-                # Tote Threads aus der Liste entfernen
-                for name in dead_threads:
-                    del self.threads[name]
+                # Blockiert bis ein Worker endet, Shutdown (None) oder die nächste Summary fällig ist
+                try:
+                    name = self._thread_exits.get(timeout=max(0.0, next_summary - time.monotonic()))
+                except Empty:
+                    name = None
+
+                # Beendeten Thread aus der Liste entfernen
+                if name is not None and not self._shutdown.is_set():
+                    if name == 'logic':
+                        logger.warning("Thread logic ist gestoppt!")  # Logic Worker kann sich nicht selbst melden
+                    else:
+                        self.logic_event_queue.put(("warning", "monitor", f"Thread {name} ist gestoppt!"))
+                    self.threads.pop(name, None)
 
                 # System-Status loggen (nur alle 30 Sekunden)
-                if int(time.time()) % 30 == 0:
-                    active_threads = len([t for t in self.threads.values() if t.is_alive()])
-                    print(f"System Status: {active_threads} aktive Threads")
+                now = time.monotonic()
+                if now >= next_summary:
+                    next_summary = now + 30
+                    print(f"System Status: {len(self.threads)} aktive Threads")
+                    
+                    # Nur neue Verwerfungen seit der letzten Summary melden
+                    dropped = self.robot_cmd_queue.dropped
+                    if dropped != reported_drops:
+                        self.logic_event_queue.put((
+                            "warning", "monitor",
+                            f"BLE-Befehlskanal: {dropped - reported_drops} veraltete Befehle verworfen (gesamt {dropped})"
+                        ))
+                        reported_drops = dropped
+
+                    # Verworfene Log-Records direkt ausgeben - über das Logging würden sie selbst verdrängt
+                    log_dropped = _log_queue_handler.dropped
+                    if log_dropped != reported_log_drops:
+                        print(f"⚠️ Log-Queue voll: {log_dropped - reported_log_drops} Log-Einträge verworfen (gesamt {log_dropped})")
+                        reported_log_drops = log_dropped
                     
                     # Digital Twin Summary ausgeben
                     if self.digital_twin:
@@ -289,7 +481,11 @@ class UWBuddyOrchestrator:
                         if summary.get('tumbller_to_target_distance'):
                             print(f"Digital Twin: {summary['total_entities']} Entities, Distanz: {summary['tumbller_to_target_distance']:.2f}m")
 
-                time.sleep(1)
+                    # Tumbller-Status (früher eigener Thread mit 2 s Polling)
+                    if self.digital_twin and logger.isEnabledFor(logging.DEBUG):
+                        tumbller_state = self.digital_twin.get_tumbller_state()
+                        if tumbller_state:
+                            logger.debug(f"Tumbller Status: in_zone={tumbller_state.get('in_zone', False)}")
 
             except Exception as e:
                 logger.error(f"Fehler im System Monitor: {e}")
@@ -298,11 +494,14 @@ class UWBuddyOrchestrator:
         """Startet alle Services"""
         print("Starte alle UWBuddy Services...")
 
+        # Log-Ausgabe zuerst - die Worker loggen ab ihrer ersten Zeile
+        _log_listener.start()
+        self._log_listener_running = True
+
         # Starte alle Service-Threads
         self.threads['ble'] = self.start_ble_service()
         self.threads['mqtt'] = self.start_mqtt_service()
         self.threads['logic'] = self.start_logic_service()
-        self.threads['tumbller'] = self.start_tumbller_service()
 
         # Starte alle Threads
         for name, thread in self.threads.items():
@@ -334,7 +533,19 @@ class UWBuddyOrchestrator:
     def shutdown(self):
         """Ordnungsgemäßer Shutdown aller Services"""
         print("Shutting down UWBuddy Orchestrator...")
-        self.running = False
+        self._shutdown.set()
+
+        # Sentinels wecken blockierte Consumer sofort statt erst nach dem get()-Timeout
+        self.robot_cmd_queue.put(None)
+        self.logic_event_queue.put(None)
+
+        # BLE Event Loop aus seinem eigenen Thread heraus stoppen
+        ble_loop = self._ble_loop
+        if ble_loop:
+            try:
+                ble_loop.call_soon_threadsafe(ble_loop.stop)
+            except RuntimeError:
+                pass  # Loop bereits geschlossen
 
         # MQTT Client beenden
         if self.mqtt_client:
@@ -352,10 +563,13 @@ class UWBuddyOrchestrator:
                 if thread.is_alive():
                     logger.warning(f"{name} Thread reagiert nicht auf Shutdown")
 
-        # Executor beenden
-        self.executor.shutdown(wait=True)
         print("UWBuddy Orchestrator beendet")
 
+        # Restliche Log-Records ausgeben und Listener-Thread beenden
+        if self._log_listener_running:
+            self._log_listener_running = False
+            _log_listener.stop()
+
 def main():
     """Hauptfunktion"""
     orchestrator = UWBuddyOrchestrator()
@@ -2,7 +2,20 @@ from orchestrate.location_mqtt import LocationMQTT
 
 from .anchor_digital_twin import AnchorZoneDigitalTwin
 from .bluetooth_orientation_receiver import BluetoothOrientationReceiver
-import time
+import asyncio
+import logging
+from itertools import count
+
+# Optional: uvloop (libuv) als schnellerer Event Loop
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+logger = logging.getLogger('MainMQTT')
+
+# Deterministic "every 10th update" gate for the model summary
+_summary_counter = count()
 
 # Global digital twin instance
 digital_twin = AnchorZoneDigitalTwin()
@@ -10,17 +23,20 @@ bluetooth_receiver = BluetoothOrientationReceiver()
 
 def process_position(node_id, pos):
     """Process incoming position data and update the digital twin"""
-    x, y, z = pos["x"], pos["y"], pos["z"]
-    print(f"📍 Node {node_id}: x={x:.4f}, y={y:.4f}, z={z:.4f}")
+    # Lazy %-Formatierung: bei deaktiviertem INFO wird kein String gebaut
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("📍 Node %s: x=%.4f, y=%.4f, z=%.4f", node_id, pos["x"], pos["y"], pos["z"])
     
     # Update the digital twin model
     digital_twin.update_entity_position(node_id, pos)
     
     # Print model summary every few updates
-    if hash(node_id) % 10 == 0:  # Print summary occasionally
-        summary_ = digital_twin.get_model_summary()
-        print(f"🗺️  Model Summary: {summary_['total_entities']} entities, "
-              f"{summary_:['entities_in_zone']} in zone")
+    if next(_summary_counter) % 10 == 0:  # Print summary every 10th update
+        # Only build the summary when someone will see it
+        if logger.isEnabledFor(logging.DEBUG):
+            summary_ = digital_twin.get_model_summary()
+            logger.debug("🗺️  Model Summary: %d entities, %d in zone",
+                         summary_['total_entities'], summary_['entities_in_zone'])
 
 def process_orientation(angular_velocity_data):
     """Process incoming angular velocity data from Bluetooth"""
@@ -38,7 +54,8 @@ TOPIC = "dwm/node/+/uplink/location"
 TUMBLLER_NODE_ID = "4c87"
 PERSON_NODE_ID = "0cad"
 
-if __name__ == "__main__":
+async def main():
+    """Runs the twin with MQTT positions and Bluetooth orientation on one event loop"""
     print("🗺️  Starting Anchor Zone Digital Twin...")
     
     # Configure entity IDs (you'll need to set these based on your actual tags)
@@ -50,9 +67,9 @@ if __name__ == "__main__":
     mqtt_client.set_location_callback(process_position)
     mqtt_client.start(BROKER, PORT)
     
-    # Start Bluetooth for orientation data
+    # Start Bluetooth for orientation data (asyncio task, no extra thread)
     bluetooth_receiver.set_orientation_callback(process_orientation)
-    bluetooth_receiver.start()
+    await bluetooth_receiver.start()
     
     print(f"   Anchor zone center: {digital_twin.anchor_center}")
     print(f"   Zone radius: {digital_twin.zone_radius}m")
@@ -61,9 +78,20 @@ if __name__ == "__main__":
     
     try:
         while True:
-            time.sleep(5)
+            await asyncio.sleep(5)
             # Periodically show model state
             summary = digital_twin.get_model_summary()
             print(f"📊 {summary}")
+    finally:
+        await bluetooth_receiver.stop()
+        mqtt_client.stop()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        if uvloop:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("Shutting down Digital Twin Model")
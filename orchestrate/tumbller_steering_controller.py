@@ -1,17 +1,95 @@
+import logging
 import math
 import time
 import threading
+from collections import deque, namedtuple
+
+logger = logging.getLogger('TumbllerSteering')
+
+# Modul-globale Aliase sparen den Attribut-Lookup auf math im Steuerungspfad
+_atan2 = math.atan2
+_sqrt = math.sqrt
+_hypot = math.hypot
+_now = time.monotonic  # monoton - NTP-Sprünge stören Rate-Limit und Befehlsdauern nicht
+_R2D = 180.0 / math.pi  # Radiant -> Grad, ersetzt math.degrees()
+_remainder = math.remainder
+_TWO_PI = 2 * math.pi
+
+
+def _steering_math(tx, ty, px, py, yaw):
+    """
+    Quadrierte Distanz, Winkeldifferenz und Zielwinkel von Tumbller (tx, ty) zur Person (px, py) in einem Aufruf.
+    Die Wurzel zieht erst, wer die echte Distanz braucht - Schwellwerte werden quadriert verglichen.
+    """
+    dx = px - tx
+    dy = py - ty
+    target_angle = _atan2(dy, dx)
+    # Auf [-π, π] normieren - ein exakter libm-Aufruf statt atan2(sin, cos) oder Modulo mit Rundungsfehler
+    angle_diff = _remainder(target_angle - yaw, _TWO_PI)
+    return dx*dx + dy*dy, angle_diff, target_angle
+
+# Anzeigenamen der Befehle für die Entscheidungs-Ausgabe
+_ACTION_NAMES = {
+    'f': 'VORWÄRTS',
+    's': 'STOPPEN',
+    'l': 'LINKS DREHEN',
+    'i': 'RECHTS DREHEN',
+    'r': 'RECHTS DREHEN',
+}
+
+# Werte einer Bewertung für die Debug-Ausgabe - Schnappschuss, kein zweiter Twin-Zugriff
+SteeringTelemetry = namedtuple('SteeringTelemetry', ('distance_sq', 'target_angle', 'estimated_yaw'))
+
+
+class _Reason:
+    """Begründung eines Befehls - wird erst formatiert, wenn sie jemand als Text braucht (z.B. beim Loggen mit %s)"""
+    __slots__ = ('template', 'args')
+
+    def __init__(self, template, *args):
+        self.template = template
+        self.args = args
+
+    def __str__(self):
+        return self.template % self.args
+
+    __repr__ = __str__
+
+
+# Node-IDs (Tumbller, Zielperson) - in dieser Reihenfolge aus dem Twin gelesen
+_STEERING_NODES = ("4c87", "0cad")
+
+# Ergebnisse, die nur aufgeschoben sind - hier muss auch ohne neue Position erneut bewertet werden
+_DEFERRED_REASONS = ("rate_limited", "befehl_noch_aktiv", "kalibrierung_aktiv")
 
 class TumbllerSteeringController:
     """
     Intelligente Steuerungslogik für den Tumbller mit zeitbasierten Befehlen
     """
     
+    # Feste Attributliste: kein __dict__ pro Instanz, Tippfehler bei Zuweisungen fallen sofort auf
+    __slots__ = (
+        'dt', 'message_queue', 'thread', '_stop_event', '_position_event', '_update_callback_registered',
+        # Steuerungsparameter
+        'min_distance', 'max_distance', 'angle_threshold', 'command_interval', 'last_command_time',
+        'turn_speed', 'max_turn_duration', 'max_forward_duration',
+        # Orientierungsschätzung und Kalibrierung
+        'estimated_yaw', 'position_history', 'last_command', 'command_start_time',
+        'calibration_mode', 'calibration_start_pos', 'calibration_interval', 'last_calibration',
+        'min_movement_for_calibration',
+        # Aktive Befehle und Entprellung
+        'active_command', 'active_command_end_time', '_auto_stop',
+        '_last_cmd', '_last_cmd_ts', 'min_repeat_interval',
+    )
+    
     def __init__(self, digital_twin, message_queue):
         self.dt = digital_twin
         self.message_queue = message_queue
-        self.running = False
         self.thread = None
+        # Einziges Stopp-Signal - wait() kehrt beim Setzen sofort zurück
+        self._stop_event = threading.Event()
+        # Weckt _run sofort bei neuer Zielposition statt erst nach dem Intervall
+        self._position_event = threading.Event()
+        self._update_callback_registered = False
         
         # Steuerungsparameter
         self.min_distance = 0.3
@@ -27,7 +105,7 @@ class TumbllerSteeringController:
         
         # Orientierungsschätzung
         self.estimated_yaw = 0.0
-        self.position_history = []
+        self.position_history = deque(maxlen=16)  # Ringpuffer, zusätzlich zeitlich begrenzt
         self.last_command = None
         self.command_start_time = 0
         self.calibration_mode = False
@@ -35,117 +113,111 @@ class TumbllerSteeringController:
         
         # Kalibrierungsparameter - DEAKTIVIERT für Tests
         self.calibration_interval = 150.0  # Alle 2 Minuten (seltener)
-        self.last_calibration = time.time()  # Starte mit aktueller Zeit
+        self.last_calibration = _now()  # Starte mit aktueller Zeit
         self.min_movement_for_calibration = 0.2
         
         # Aktive Befehlsverfolgung
         self.active_command = None
         self.active_command_end_time = 0
+        # Geplanter Auto-Stopp als (fällig_um, grund) - ein Slot, der nächste zeitbasierte Befehl ersetzt ihn.
+        # Wird im _run-Thread ausgelöst, kein eigener Thread pro Befehl.
+        self._auto_stop = None
+        
+        # Entprellung: identische Befehle nicht erneut in die BLE-Queue legen
+        self._last_cmd = None
+        self._last_cmd_ts = 0.0
+        self.min_repeat_interval = 1.0
         
-        print(f"Steering Controller mit zeitbasierten Befehlen initialisiert:")
-        print(f"  Digital Twin: {id(self.dt)}")
-        print(f"  Message Queue: {id(self.message_queue)}")
+        logger.info("Steering Controller mit zeitbasierten Befehlen initialisiert")
+        logger.debug("  Digital Twin: %s", id(self.dt))
+        logger.debug("  Message Queue: %s", id(self.message_queue))
         
-    def _update_position_history(self, position):
+    def _update_position_history(self, position, current_time):
         """Aktualisiert die Positionshistorie"""
-        current_time = time.time()
-        self.position_history.append({
-            'position': position.copy(),
-            'timestamp': current_time
-        })
-        
-        # Behalte nur die letzten 15 Sekunden
-        self.position_history = [
-            entry for entry in self.position_history
-            if current_time - entry['timestamp'] <= 15.0
-        ]
+        history = self.position_history
+        x = position['x']
+        y = position['y']
+        
+        # Segment zum Vorgänger einmal beim Anhängen berechnen - jedes Segment fließt in zwei Schätzungen ein
+        seg_dx = seg_dy = seg_distance = 0.0
+        if history:
+            prev_x, prev_y = history[-1][0], history[-1][1]
+            dx = x - prev_x
+            dy = y - prev_y
+            # Mindestbewegung 5cm quadriert prüfen - Wurzel nur für Segmente, die zählen
+            # (im Stand ist fast jedes Segment nur Messrauschen)
+            distance_sq = dx*dx + dy*dy
+            if distance_sq > 0.0025:
+                seg_dx, seg_dy, seg_distance = dx, dy, _sqrt(distance_sq)
+        
+        # Eintrag als (x, y, zeitstempel, segment_dx, segment_dy, segment_distanz) - keine Dict-Kopie
+        history.append((x, y, current_time, seg_dx, seg_dy, seg_distance))
+        
+        # Behalte nur die letzten 15 Sekunden - älteste Einträge stehen links
+        while current_time - history[0][2] > 15.0:
+            history.popleft()
     
     def _estimate_orientation_from_movement(self):
         """Schätzt Orientierung basierend auf Bewegungsrichtung"""
-        if len(self.position_history) < 3:
+        history = self.position_history
+        if len(history) < 3:
             return None
             
-        # Verwende die letzten 3 Positionen für stabilere Schätzung
-        recent_positions = self.position_history[-3:]
-        
-        # Berechne Durchschnittsbewegung
-        total_dx = 0
-        total_dy = 0
-        total_distance = 0
+        # Verwende die letzten 3 Positionen (= die letzten 2 Segmente) für stabilere Schätzung
+        _, _, _, dx1, dy1, distance1 = history[-2]
+        _, _, _, dx2, dy2, distance2 = history[-1]
         
-        for i in range(len(recent_positions) - 1):
-            pos1 = recent_positions[i]['position']
-            pos2 = recent_positions[i + 1]['position']
-            
-            dx = pos2['x'] - pos1['x']
-            dy = pos2['y'] - pos1['y']
-            distance = math.sqrt(dx*dx + dy*dy)
-            
-            if distance > 0.05:  # Mindestbewegung 5cm
-                total_dx += dx
-                total_dy += dy
-                total_distance += distance
-        
-        if total_distance < 0.1:  # Zu wenig Gesamtbewegung
+        if distance1 + distance2 < 0.1:  # Zu wenig Gesamtbewegung
             return None
             
         # Durchschnittliche Bewegungsrichtung
-        movement_angle = math.atan2(total_dy, total_dx)
-        return movement_angle
+        return _atan2(dy1 + dy2, dx1 + dx2)
     
-    def _should_calibrate(self):
+    def _should_calibrate(self, current_time):
         """Prüft ob eine Kalibrierung nötig ist - DEAKTIVIERT für Tests"""
         return False  # Kalibrierung temporär deaktiviert
-        # current_time = time.time()
         # return (current_time - self.last_calibration) > self.calibration_interval
     
-    def _start_calibration(self, tumbller_pos):
+    def _start_calibration(self, tumbller_pos, current_time):
         """Startet Kalibrierungsmodus mit korrigierter Logik"""
         self.calibration_mode = True
-        self.calibration_start_pos = tumbller_pos.copy()
-        self.command_start_time = time.time()
-        print("Starte Orientierungskalibrierung - fahre 1.5s vorwärts...")
+        self.calibration_start_pos = (tumbller_pos['x'], tumbller_pos['y'])
+        self.command_start_time = current_time
+        logger.info("Starte Orientierungskalibrierung - fahre 1.5s vorwärts...")
         
         # Sende Vorwärts-Befehl
-        self._send_ble_command("f", "kalibrierung_start")
+        self._send_ble_command("f", "kalibrierung_start", current_time)
         
         # Automatischer Stopp nach 1.5 Sekunden
-        def auto_stop_calibration():
-            time.sleep(1.5)
-            if self.calibration_mode:  # Nur wenn Kalibrierung noch aktiv
-                self._send_ble_command("s", "kalibrierung_stopp")
-                print("Kalibrierung: Stopp-Befehl gesendet")
-        
-        threading.Thread(target=auto_stop_calibration, daemon=True).start()
+        self._auto_stop = (self.command_start_time + 1.5, "kalibrierung_stopp")
         
         return None, "kalibrierung_gestartet"
     
-    def _finish_calibration(self, tumbller_pos):
+    def _finish_calibration(self, tumbller_pos, current_time):
         """Beendet Kalibrierungsmodus"""
         if not self.calibration_start_pos:
             return
             
-        dx = tumbller_pos['x'] - self.calibration_start_pos['x']
-        dy = tumbller_pos['y'] - self.calibration_start_pos['y']
+        start_x, start_y = self.calibration_start_pos
+        dx = tumbller_pos['x'] - start_x
+        dy = tumbller_pos['y'] - start_y
         
-        movement_distance = math.sqrt(dx*dx + dy*dy)
+        movement_distance = _hypot(dx, dy)
         
         if movement_distance > self.min_movement_for_calibration:
-            self.estimated_yaw = math.atan2(dy, dx)
-            print(f"Kalibrierung erfolgreich - neue Orientierung: {math.degrees(self.estimated_yaw):.0f}°")
-            self.last_calibration = time.time()
+            self.estimated_yaw = _atan2(dy, dx)
+            logger.info("Kalibrierung erfolgreich - neue Orientierung: %.0f°", self.estimated_yaw * _R2D)
+            self.last_calibration = current_time
         else:
-            print("Kalibrierung fehlgeschlagen - zu wenig Bewegung")
+            logger.warning("Kalibrierung fehlgeschlagen - zu wenig Bewegung")
             
         self.calibration_mode = False
         self.calibration_start_pos = None
     
-    def _send_timed_command(self, command, duration, reason):
+    def _send_timed_command(self, command, duration, reason, current_time):
         """Sendet einen zeitbasierten Befehl"""
-        current_time = time.time()
-        
         # Sofort den Befehl senden
-        success = self._send_ble_command(command, reason)
+        success = self._send_ble_command(command, reason, current_time)
         if not success:
             return False
             
@@ -153,27 +225,45 @@ class TumbllerSteeringController:
         self.active_command = command
         self.active_command_end_time = current_time + duration
         
-        # Automatischer Stopp nach der Zeit
-        def auto_stop():
-            time.sleep(duration)
-            if self.active_command == command:  # Nur stoppen wenn noch der gleiche Befehl aktiv
-                self._send_ble_command("s", f"auto_stop_nach_{duration:.1f}s")
-                self.active_command = None
-                self.active_command_end_time = 0
-        
-        threading.Thread(target=auto_stop, daemon=True).start()
+        # Automatischer Stopp nach der Zeit - ersetzt einen noch ausstehenden Stopp des Vorgängerbefehls
+        self._auto_stop = (self.active_command_end_time, _Reason("auto_stop_nach_%.1fs", duration))
         return True
     
-    def _send_ble_command(self, command, reason):
+    def _run_due_auto_stop(self, now):
+        """Sendet den geplanten Stopp, wenn er fällig ist. Rückgabe: Sekunden bis zur Fälligkeit oder None"""
+        auto_stop = self._auto_stop
+        if auto_stop is None:
+            return None
+        
+        due, reason = auto_stop
+        if now < due:
+            return due - now
+        
+        self._auto_stop = None
+        self._send_ble_command("s", reason, now)
+        if self.calibration_mode:
+            logger.info("Kalibrierung: Stopp-Befehl gesendet")
+        else:
+            self.active_command = None
+            self.active_command_end_time = 0
+        return None
+    
+    def _send_ble_command(self, command, reason, now):
         """Sendet BLE-Befehl über die Message Queue"""
+        if command == self._last_cmd and now - self._last_cmd_ts < self.min_repeat_interval:
+            return True  # Roboter führt diesen Befehl bereits aus
+        
         try:
-            self.message_queue.put(("robot_command", "ble", {
+            # Eigene BLE-Queue - kein message_type/service-Umschlag nötig
+            self.message_queue.put({
                 "command": command,
                 "reason": reason
-            }))
+            })
+            self._last_cmd = command
+            self._last_cmd_ts = now
             return True
         except Exception as e:
-            print(f"Fehler beim Senden des Steering-Befehls: {e}")
+            logger.error("Fehler beim Senden des Steering-Befehls: %s", e)
             return False
     
     def _calculate_turn_duration(self, angle_diff):
@@ -195,161 +285,205 @@ class TumbllerSteeringController:
         duration = max(0.3, min(self.max_forward_duration, estimated_duration))
         return duration
     
-    def calculate_steering_command(self):
-        """Berechnet optimalen zeitbasierten Steuerungsbefehl"""
-        current_time = time.time()
+    def calculate_steering_command(self, current_time=None):
+        """
+        Berechnet optimalen zeitbasierten Steuerungsbefehl.
+        current_time: Zeitstempel der Runde (time.monotonic), damit alle Schritte dieselbe Zeit sehen.
+        Rückgabe: ((befehl, dauer), grund, telemetrie) oder (None, grund, None).
+        dauer ist None bei einfachen Befehlen (meist Stopp), telemetrie ist SteeringTelemetry oder None
+        """
+        if current_time is None:
+            current_time = _now()
         
         # Prüfe ob noch ein Befehl aktiv ist
         if self.active_command and current_time < self.active_command_end_time:
-            return None, "befehl_noch_aktiv"
+            return None, "befehl_noch_aktiv", None
         
         # Rate-Limiting
         if current_time - self.last_command_time < self.command_interval:
-            return None, "rate_limited"
+            return None, "rate_limited", None
         
-        # Hole Positionen
-        tumbller_state = self.dt.get_entity_state("4c87")
-        person_state = self.dt.get_entity_state("0cad")
+        # Hole beide Positionen mit einem Lock-Zugriff - konsistenter Schnappschuss
+        tumbller_pos, target_pos = self.dt.get_entity_positions(_STEERING_NODES)
         
-        if not (tumbller_state and person_state and 
-                'position' in tumbller_state and 'position' in person_state):
-            return None, "missing_positions"
-        
-        tumbller_pos = tumbller_state['position']
-        target_pos = person_state['position']
+        if tumbller_pos is None or target_pos is None:
+            return None, "missing_positions", None
         
         # Aktualisiere Positionshistorie
-        self._update_position_history(tumbller_pos)
+        self._update_position_history(tumbller_pos, current_time)
         
         # Kalibrierungsmodus - KORRIGIERT!
         if self.calibration_mode:
             if current_time - self.command_start_time > 3.0:  # Nach 3 Sekunden beenden
-                self._finish_calibration(tumbller_pos)
-                return "s", "kalibrierung_beendet"  # Sicherheits-Stopp
+                self._finish_calibration(tumbller_pos, current_time)
+                return ("s", None), "kalibrierung_beendet", None  # Sicherheits-Stopp
             else:
-                return None, "kalibrierung_aktiv"  # Warte auf automatischen Stopp
+                return None, "kalibrierung_aktiv", None  # Warte auf automatischen Stopp
         
         # Prüfe ob Kalibrierung nötig ist
-        if self._should_calibrate():
-            return self._start_calibration(tumbller_pos)
-        
-        # Distanz und Zielwinkel berechnen
-        dx = target_pos['x'] - tumbller_pos['x']
-        dy = target_pos['y'] - tumbller_pos['y']
-        distance = math.sqrt(dx*dx + dy*dy)
-        target_angle = math.atan2(dy, dx)
+        if self._should_calibrate(current_time):
+            return self._start_calibration(tumbller_pos, current_time) + (None,)
         
         # Orientierung schätzen
-        movement_orientation = self._estimate_orientation_from_movement()
-        if movement_orientation is not None:
-            self.estimated_yaw = movement_orientation
+        estimated_yaw = self._estimate_orientation_from_movement()
+        if estimated_yaw is not None:
+            self.estimated_yaw = estimated_yaw
+        else:
+            estimated_yaw = self.estimated_yaw
             
-        # Winkeldifferenz berechnen
-        angle_diff = self._normalize_angle(target_angle - self.estimated_yaw)
+        # Distanz, Zielwinkel und Winkeldifferenz in einem Schritt
+        distance_sq, angle_diff, target_angle = _steering_math(
+            tumbller_pos['x'], tumbller_pos['y'],
+            target_pos['x'], target_pos['y'],
+            estimated_yaw)
         
         # Entscheidung mit zeitbasierten Befehlen
-        command_tuple, reason = self._decide_timed_action(distance, angle_diff, target_angle)
+        command_tuple, reason = self._decide_timed_action(distance_sq, angle_diff, target_angle)
         
         if command_tuple:
             self.last_command_time = current_time
             
-        return command_tuple, reason
+        return command_tuple, reason, SteeringTelemetry(distance_sq, target_angle, estimated_yaw)
     
-    def _normalize_angle(self, angle):
-        return math.atan2(math.sin(angle), math.cos(angle))
-    
-    def _decide_timed_action(self, distance, angle_diff, target_angle):
-        """Entscheidet zeitbasierte Aktionen"""
-        if distance < self.min_distance:
-            return "s", f"zu_nah_{distance:.1f}m"
+    def _decide_timed_action(self, distance_sq, angle_diff, target_angle):
+        """Entscheidet zeitbasierte Aktionen - Distanzschwellen werden quadriert verglichen"""
+        if distance_sq < self.min_distance * self.min_distance:
+            return ("s", None), _Reason("zu_nah_%.1fm", _sqrt(distance_sq))
         
-        if distance > self.max_distance:
+        if distance_sq > self.max_distance * self.max_distance:
             # Prüfe Richtung zuerst
             if abs(angle_diff) > self.angle_threshold:
                 # Berechne optimale Drehzeit
                 turn_duration = self._calculate_turn_duration(angle_diff)
                 
                 if angle_diff > 0:
-                    return ("l", turn_duration), f"links_drehen_{turn_duration:.1f}s_um_{math.degrees(angle_diff):.0f}grad"
+                    return ("l", turn_duration), _Reason("links_drehen_%.1fs_um_%.0fgrad", turn_duration, angle_diff * _R2D)
                 else:
-                    return ("i", turn_duration), f"rechts_drehen_{turn_duration:.1f}s_um_{math.degrees(abs(angle_diff)):.0f}grad"
+                    return ("i", turn_duration), _Reason("rechts_drehen_%.1fs_um_%.0fgrad", turn_duration, -angle_diff * _R2D)
             else:
                 # Richtige Richtung - fahre vorwärts
+                distance = _sqrt(distance_sq)
                 forward_duration = self._calculate_forward_duration(distance)
-                return ("f", forward_duration), f"folgen_{forward_duration:.1f}s_distanz_{distance:.1f}m"
+                return ("f", forward_duration), _Reason("folgen_%.1fs_distanz_%.1fm", forward_duration, distance)
         
-        return "s", f"perfekte_distanz_{distance:.1f}m"
+        return ("s", None), _Reason("perfekte_distanz_%.1fm", _sqrt(distance_sq))
     
+    def on_position_update(self, node_id):
+        """Update-Callback des Digital Twin - bei Tumbller/Ziel-Bewegung neu bewerten"""
+        # Event koalesziert Bursts: mehrere Updates vor dem nächsten Durchlauf = ein Durchlauf
+        if node_id in _STEERING_NODES:
+            self._position_event.set()
+
     def start(self, interval=0.5):
-        if self.running:
+        if self.thread and self.thread.is_alive():
             return
-        self.running = True
+        self._stop_event.clear()
+        # Am Twin für Positions-Updates anmelden - dann muss _run im Leerlauf nicht periodisch aufwachen.
+        # Twins ohne Callback-Unterstützung werden weiter alle interval Sekunden abgefragt.
+        register = getattr(self.dt, 'register_update_callback', None)
+        if register and not self._update_callback_registered:
+            register(self.on_position_update)
+            self._update_callback_registered = True
         self.thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
         self.thread.start()
-        print("Tumbller Steering Controller mit zeitbasierten Befehlen gestartet")
+        logger.info("Tumbller Steering Controller mit zeitbasierten Befehlen gestartet")
     
     def _run(self, interval):
-        while self.running:
-            try:
-                command_result = self.calculate_steering_command()
+        # Einziger Fänger: ein Logikfehler beendet die Steuerung sichtbar statt jede Runde still verschluckt zu werden
+        try:
+            self._control_loop(interval)
+        except Exception:
+            logger.exception("Steering Controller abgebrochen")
+    
+    def _control_loop(self, interval):
+        last_version = None
+        # Pro Runde gelesene Attribute einmal als Locals binden
+        dt = self.dt
+        stop_event = self._stop_event
+        position_event = self._position_event
+        calculate_steering_command = self.calculate_steering_command
+        run_due_auto_stop = self._run_due_auto_stop
+        # Ohne anstehende Frist nur bei Positions-Updates (oder stop) aufwachen - außer der Twin meldet keine Updates
+        idle_timeout = None if self._update_callback_registered else interval
+        while not stop_event.is_set():
+            # Ein Zeitstempel pro Runde für Auto-Stopp, Rate-Limit, Historie und Entprellung
+            now = _now()
+            
+            # Fällige Auto-Stopps zuerst, damit der Roboter nicht über die Befehlsdauer hinaus fährt
+            run_due_auto_stop(now)
+            
+            # Nur neu rechnen, wenn der Twin seit der letzten abgeschlossenen Bewertung neue Positionen hat
+            version = dt.version
+            if version == last_version:
+                command_result = (None, "unveraendert", None)
+            else:
+                command_result = calculate_steering_command(now)
+                if command_result[1] not in _DEFERRED_REASONS:
+                    last_version = version
+            
+            # Kein Befehl bei aufgeschobenen/fehlenden Ergebnissen - nur Entscheidungen tragen einen Befehl
+            if command_result[0]:
+                command_tuple, reason, telemetry = command_result
                 
-                if command_result[0] and command_result[1] not in ["rate_limited", "missing_positions", "kalibrierung_aktiv", "befehl_noch_aktiv"]:
-                    command_tuple, reason = command_result
-                    
-                    # Debug Info
-                    tumbller_state = self.dt.get_entity_state("4c87")
-                    person_state = self.dt.get_entity_state("0cad")
+                # Debug Info - Werte aus der Berechnung, kein zweiter Twin-Zugriff
+                # Formatierung (und Wurzel) nur wenn DEBUG aktiv ist
+                if telemetry and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Smart Steering: Distanz %.2fm, Zielrichtung %.0f°, Geschätzte Orientierung %.0f°",
+                                 _sqrt(telemetry.distance_sq), telemetry.target_angle * _R2D,
+                                 telemetry.estimated_yaw * _R2D)
+                
+                command, duration = command_tuple
+                if duration is None:
+                    # Einfacher Befehl (meist Stopp)
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("Steering Entscheidung: %s (%s)",
+                                    _ACTION_NAMES.get(command) or f'UNKNOWN({command})', reason)
                     
-                    if tumbller_state and person_state:
-                        tpos = tumbller_state['position']
-                        ppos = person_state['position']
-                        dx = ppos['x'] - tpos['x']
-                        dy = ppos['y'] - tpos['y']
-                        distance = math.sqrt(dx*dx + dy*dy)
-                        target_angle = math.atan2(dy, dx)
-                        
-                        print(f"Smart Steering: Distanz {distance:.2f}m, "
-                              f"Zielrichtung {math.degrees(target_angle):.0f}°, "
-                              f"Geschätzte Orientierung {math.degrees(self.estimated_yaw):.0f}°")
+                    success = self._send_ble_command(command, reason, now)
+                else:
+                    # Zeitbasierter Befehl mit Auto-Stopp
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("Steering Entscheidung: %s für %.1fs (%s)",
+                                    _ACTION_NAMES.get(command) or f'UNKNOWN({command})', duration, reason)
                     
-                    # Führe zeitbasierten Befehl aus
-                    if isinstance(command_tuple, tuple):
-                        command, duration = command_tuple
-                        action_names = {
-                            'f': 'VORWÄRTS',
-                            's': 'STOPPEN',
-                            'l': 'LINKS DREHEN',
-                            'i': 'RECHTS DREHEN'
-                        }
-                        action_name = action_names.get(command, f'UNKNOWN({command})')
-                        print(f"Steering Entscheidung: {action_name} für {duration:.1f}s ({reason})")
-                        
-                        success = self._send_timed_command(command, duration, reason)
-                        if not success:
-                            print("Warnung: Konnte zeitbasierten Steering-Befehl nicht senden")
-                    else:
-                        # Einfacher Befehl (meist Stopp)
-                        command = command_tuple
-                        action_names = {
-                            'f': 'VORWÄRTS',
-                            's': 'STOPPEN',
-                            'l': 'LINKS DREHEN',
-                            'i': 'RECHTS DREHEN'
-                        }
-                        action_name = action_names.get(command, f'UNKNOWN({command})')
-                        print(f"Steering Entscheidung: {action_name} ({reason})")
-                        
-                        success = self._send_ble_command(command, reason)
-                        if not success:
-                            print("Warnung: Konnte Steering-Befehl nicht senden")
-                
-            except Exception as e:
-                print(f"Fehler im Steering Controller: {e}")
+                    success = self._send_timed_command(command, duration, reason, now)
+                if not success:
+                    logger.warning("Konnte Steering-Befehl nicht senden")
+            
+            # Bei Positions-Update sofort neu bewerten - und rechtzeitig zum nächsten Auto-Stopp aufwachen
+            now = _now()
+            timeout = idle_timeout
+            until_stop = run_due_auto_stop(now)
+            if until_stop is not None and (timeout is None or until_stop < timeout):
+                timeout = until_stop
             
-            time.sleep(interval)
+            deferred_until = self._deferred_until(command_result[1])
+            if deferred_until is not None:
+                # Bewertung ist bis zu einem festen Zeitpunkt aufgeschoben - neue Positionen ändern daran nichts,
+                # also nicht bei jedem Update aufwachen, nur zur Frist (oder beim Stoppen)
+                until_deferred = max(0.0, deferred_until - now)
+                stop_event.wait(until_deferred if timeout is None else min(timeout, until_deferred))
+            else:
+                position_event.wait(timeout)
+            position_event.clear()
+        
+        # Beim Stoppen keinen laufenden zeitbasierten Befehl offen lassen - ausstehenden Auto-Stopp sofort senden
+        if self._auto_stop is not None:
+            run_due_auto_stop(self._auto_stop[0])  # Fälligkeitszeit übergeben = jetzt fällig
+    
+    def _deferred_until(self, reason):
+        """Zeitpunkt, ab dem eine aufgeschobene Bewertung wieder sinnvoll ist - None wenn nicht aufgeschoben"""
+        if reason == "rate_limited":
+            return self.last_command_time + self.command_interval
+        if reason == "befehl_noch_aktiv":
+            return self.active_command_end_time
+        if reason == "kalibrierung_aktiv":
+            return self.command_start_time + 3.0
+        return None
     
     def stop(self):
-        self.running = False
+        self._stop_event.set()
+        self._position_event.set()  # aus dem Warten im _run wecken
         if self.thread:
             self.thread.join()
-        print("Tumbller Steering Controller gestoppt")
+        logger.info("Tumbller Steering Controller gestoppt")